@@ -3,9 +3,15 @@ from dataclasses import dataclass, field
 from pprint import pprint
 from typing import List, Optional, Tuple, Dict
 
+from signature_algorithms.curve import Point
 from signature_algorithms.ecdsa_signature import ECDSA
 from signature_algorithms.key_pair import KeyPair
-from hash_lib.Keccak.Keccak import Keccak
+from blockchain.hash import Hash
+
+# Size of the account id (Keccak-256) in the binary encodings.
+ACCOUNT_ID_SIZE = 32
+# Size of an encoded public key (see Point.to_bytes).
+PUBLIC_KEY_SIZE = 33
 
 
 @dataclass
@@ -37,9 +43,32 @@ class Account:
         self.wallet.clear()
         self.wallet.append(KeyPair())
         self.wallet.append(KeyPair())
-        self.account_id = Keccak().update(str(self.wallet).encode())
+        self.account_id = Hash.to_keccak(str(self.wallet))
         return deepcopy(self)
 
+    @staticmethod
+    def from_public_keys(account_id: str, public_keys: List[Point]) -> "Account":
+        """
+        The public view of an account, as it is known from an encoded operation: the id and the public keys
+        of the wallet, without the private keys and with zero balance.
+        :return: object of class Account.
+        """
+        account = Account(account_id)
+        account.wallet.extend(KeyPair(public_key=public_key) for public_key in public_keys)
+        return account
+
+    def id_bytes(self) -> bytes:
+        """
+        :return: the account id in ACCOUNT_ID_SIZE bytes.
+        """
+        return bytes.fromhex(self.account_id)
+
+    def public_keys_bytes(self) -> bytes:
+        """
+        :return: the number of keys in the wallet (1 byte) and the encoded public keys.
+        """
+        return bytes([len(self.wallet)]) + b"".join(pair.public_key_bytes() for pair in self.wallet)
+
     def add_key_pair_to_wallet(self, key_pair: KeyPair) -> None:
         """
         A function that allows you to add a new key pair to a wallet and use it to sign transactions
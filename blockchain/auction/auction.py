@@ -69,8 +69,8 @@ class Auction:
         return True
 
     def verify_bid(self, account: Account, block: Block, transaction: Transaction) -> Tuple[bool, int]:
-        if block not in self.blockchain.block_history or \
-                transaction not in self.blockchain.tx_database or \
+        if not self.blockchain.has_block(block) or \
+                not self.blockchain.has_transaction(transaction) or \
                 account.account_id not in self.blockchain.coin_database:
             return False, 0
 
@@ -1,9 +1,41 @@
+from concurrent.futures import Executor
 from copy import deepcopy
 from dataclasses import dataclass, field
-from typing import Optional, List, Callable
+from itertools import chain
+from typing import Optional, List, Callable, Dict, Tuple
 
 from blockchain.account import Account
+from blockchain.hash import Hash
 from blockchain.transaction.transaction import Transaction
+from signature_algorithms.curve import Point
+from signature_algorithms.ecdsa_signature import ECDSA
+
+# Number of signature checks sent to a worker process at once (see Block.verify_signatures).
+VERIFY_CHUNK_SIZE = 32
+
+# Block header (see Block.header): version | prev_hash | transactions commitment | timestamp | target | nonce,
+# big-endian fixed-size fields. The nonce is the last one, so the hash state of everything before it is computed
+# once per block and only the nonce is hashed on each proof-of-work attempt.
+BLOCK_VERSION = 1
+VERSION_SIZE = 4
+PREV_HASH_SIZE = 32
+TX_ROOT_SIZE = 20
+TIMESTAMP_SIZE = 8
+TARGET_SIZE = 32
+NONCE_SIZE = 8
+HEADER_SIZE = VERSION_SIZE + PREV_HASH_SIZE + TX_ROOT_SIZE + TIMESTAMP_SIZE + TARGET_SIZE + NONCE_SIZE
+
+# Binary encoding of a block (see Block.to_bytes): header | number of transactions | for each transaction its length
+# and Transaction.to_bytes. The lengths allow to skip a transaction without decoding it.
+TX_COUNT_SIZE = 4
+TX_LENGTH_SIZE = 4
+
+
+def verify_chunk(items: List[Tuple[Point, str, Tuple[int, int]]]) -> List[bool]:
+    """
+    Task of a worker process: it must be a module-level function to be sent to a process pool.
+    """
+    return ECDSA().verify_batch(items)
 
 
 @dataclass
@@ -21,6 +53,8 @@ class Block:
     target: int = field(default=0x0fffffffffffffffffffffffffffffffffffffff)
     # Nonce
     nonce: int = field(default=0)
+    # Version of the header layout.
+    version: int = field(default=BLOCK_VERSION)
 
     def __post_init__(self):
         self.set_of_transactions = []
@@ -47,9 +81,99 @@ class Block:
 
         return None
 
+    def get_transactions_root(self) -> bytes:
+        """
+        Commitment to the transactions: the root of the Merkle tree (SHA-1) of their ids,
+        the last node of an odd level is paired with itself.
+        :return: 20 bytes, zeros if the block has no transactions.
+        """
+        level = [bytes.fromhex(tx.transaction_id) for tx in self.set_of_transactions]
+        if not level:
+            return bytes(TX_ROOT_SIZE)
+        while len(level) > 1:
+            if len(level) % 2 == 1:
+                level.append(level[-1])
+            level = [Hash.new_sha1(level[i]).update(level[i + 1]).digest() for i in range(0, len(level), 2)]
+        return level[0]
+
+    def header_prefix(self) -> bytes:
+        """
+        :return: the header without the nonce.
+        """
+        return self.version.to_bytes(VERSION_SIZE, "big") + \
+            int(self.prev_hash, 16).to_bytes(PREV_HASH_SIZE, "big") + \
+            self.get_transactions_root() + \
+            self.timestamp.to_bytes(TIMESTAMP_SIZE, "big") + \
+            self.target.to_bytes(TARGET_SIZE, "big")
+
+    def header(self) -> bytes:
+        """
+        :return: the fixed-layout header, the block id is its hash.
+        """
+        return self.header_prefix() + self.nonce.to_bytes(NONCE_SIZE, "big")
+
+    def to_bytes(self) -> bytes:
+        """
+        Canonical encoding of the block, see the description of the layout at the top of the module.
+        :return: encoded block.
+        """
+        parts = [self.header(), len(self.set_of_transactions).to_bytes(TX_COUNT_SIZE, "big")]
+        for tx in self.set_of_transactions:
+            encoded = tx.to_bytes()
+            parts.append(len(encoded).to_bytes(TX_LENGTH_SIZE, "big"))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @staticmethod
+    def from_bytes(data: bytes, accounts: Optional[Dict[str, Account]] = None) -> "Block":
+        """
+        Decode a block encoded by to_bytes. The block id is the hash of the encoded header, so verify_block
+        detects transactions that don't match the header. prev_hash is decoded as a 40-digit hex id.
+        :param accounts: known accounts by id, see Operation.from_bytes.
+        :return: Block object.
+        """
+        data = memoryview(data)
+        if len(data) < HEADER_SIZE + TX_COUNT_SIZE:
+            raise ValueError("The encoded block is truncated.")
+        version, prev_hash, _, timestamp, target, nonce = Block.parse_header(data[:HEADER_SIZE])
+        block = Block(timestamp, prev_hash, target=target, nonce=nonce, version=version)
+        block.block_id = Hash.to_sha1(bytes(data[:HEADER_SIZE]))
+
+        offset = HEADER_SIZE
+        tx_count = int.from_bytes(data[offset:offset + TX_COUNT_SIZE], "big")
+        offset += TX_COUNT_SIZE
+        for _ in range(tx_count):
+            length = int.from_bytes(data[offset:offset + TX_LENGTH_SIZE], "big")
+            offset += TX_LENGTH_SIZE
+            if len(data) < offset + length:
+                raise ValueError("The encoded block is truncated.")
+            block.set_of_transactions.append(Transaction.from_bytes(data[offset:offset + length], accounts))
+            offset += length
+        if offset != len(data):
+            raise ValueError("Wrong length of the encoded block.")
+        return block
+
+    @staticmethod
+    def parse_header(header: bytes) -> Tuple[int, str, bytes, int, int, int]:
+        """
+        :return: version, prev_hash, transactions root, timestamp, target and nonce of an encoded header.
+        """
+        if len(header) != HEADER_SIZE:
+            raise ValueError("Wrong length of the block header.")
+        values = []
+        offset = 0
+        for size in (VERSION_SIZE, PREV_HASH_SIZE, TX_ROOT_SIZE, TIMESTAMP_SIZE, TARGET_SIZE, NONCE_SIZE):
+            values.append(header[offset:offset + size])
+            offset += size
+        version, prev_hash, tx_root, timestamp, target, nonce = values
+        if int.from_bytes(version, "big") != BLOCK_VERSION:
+            raise ValueError(f"Unknown block version: {int.from_bytes(version, 'big')}.")
+        return BLOCK_VERSION, "%040x" % int.from_bytes(prev_hash, "big"), bytes(tx_root), \
+            int.from_bytes(timestamp, "big"), int.from_bytes(target, "big"), int.from_bytes(nonce, "big")
+
     def get_new_block_id(self, hash_alg: Callable) -> None:
         self.nonce += 1
-        self.block_id = hash_alg(self.__repr__())
+        self.block_id = hash_alg(self.header())
 
     def add_coinbase_transaction(self, miner: Account, amount: int) -> bool:
         tx = Transaction().crete_coinbase_transaction(miner, amount)
@@ -87,18 +211,54 @@ class Block:
             self.set_of_transactions.insert(1, transaction)
         return True
 
-    def verify_block(self) -> bool:
+    def verify_block(self, executor: Optional[Executor] = None) -> bool:
+        """
+        :param executor: optional process pool to spread the signature checks over (see verify_signatures).
+        :return: true if the block is valid.
+        """
+        signatures = self.verify_signatures(executor)
         seen = set()
         for tx in self.set_of_transactions:
             if tx.sequence == -1:
                 continue
-            if not tx.verify_transaction():
+            if not tx.verify_transaction(signatures=signatures[id(tx)]):
                 return False
             if tx in seen:
                 return False
             seen.add(tx)
 
-        if self.target < int(self.block_id, 16):
+        if self.block_id != Hash.to_sha1(self.header()) or self.target < int(self.block_id, 16):
             return False
 
         return True
+
+    def verify_signatures(self, executor: Optional[Executor] = None) -> Dict[int, List[bool]]:
+        """
+        Check the signatures of all operations of the block with a single ECDSA.verify_batch call.
+        If an executor (e.g. concurrent.futures.ProcessPoolExecutor) is given, the checks are split into chunks
+        that are verified in parallel; the results are gathered in order, so they are the same as in the serial case.
+        :return: id(transaction) -> signature check result of each of its operations.
+        """
+        items = []
+        owners = []
+        for tx in self.set_of_transactions:
+            if tx.sequence == -1:
+                continue
+            for op in tx.set_of_operations:
+                if op is None:
+                    continue
+                for item in op.signature_items():
+                    items.append(item)
+                    owners.append(op)
+
+        if executor is None:
+            results = ECDSA().verify_batch(items)
+        else:
+            chunks = [items[i:i + VERIFY_CHUNK_SIZE] for i in range(0, len(items), VERIFY_CHUNK_SIZE)]
+            results = list(chain.from_iterable(executor.map(verify_chunk, chunks)))
+
+        valid = set()
+        for op, ok in zip(owners, results):
+            if ok:
+                valid.add(id(op))
+        return {id(tx): [id(op) in valid for op in tx.set_of_operations] for tx in self.set_of_transactions}
@@ -0,0 +1,305 @@
+import mmap
+import os
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Union, Iterator, Tuple
+
+from blockchain.account import Account
+from blockchain.block import Block, HEADER_SIZE
+from blockchain.block_view import BlockView
+from blockchain.hash import Hash
+
+"""
+Append-only block store on disk, it can be used as Blockchain.block_history instead of a list.
+blocks.dat: file header (magic, version), then one record per block: length | CRC-32 | Block.to_bytes.
+blocks.idx: one fixed-size record per block (the height is the position): offset of the block record | block id.
+blocks.ids: hash table block id -> height (open addressing, linear probing), one slot per entry holding height + 1
+(0 is an empty slot); its header keeps the number of heights inserted. It is derived from blocks.idx: the missing
+heights are inserted on open, and it is rebuilt (with twice the capacity when it gets half full) if it is unusable.
+The files are read through mmap, so neither the blocks nor the ids are kept in memory (except a few recently
+decoded blocks), memory use doesn't depend on the length of the history.
+An append writes and syncs the block record first and the index record second. When the store is opened,
+index records pointing past the valid data are dropped, complete records after the last indexed one are indexed
+again and a partially written record at the end of blocks.dat is cut off, so a crash at any point of an append
+leaves the store as it was before the append or with the block appended.
+"""
+
+STORE_MAGIC = b"BBBS"
+STORE_VERSION = 1
+FILE_HEADER_SIZE = 8
+RECORD_LENGTH_SIZE = 4
+RECORD_CRC_SIZE = 4
+RECORD_HEADER_SIZE = RECORD_LENGTH_SIZE + RECORD_CRC_SIZE
+OFFSET_SIZE = 8
+BLOCK_ID_SIZE = 20
+INDEX_RECORD_SIZE = OFFSET_SIZE + BLOCK_ID_SIZE
+# Number of decoded blocks kept in memory.
+BLOCK_CACHE_SIZE = 16
+
+ID_TABLE_MAGIC = b"BBIT"
+ID_TABLE_CAPACITY_SIZE = 4
+ID_TABLE_COUNT_SIZE = 8
+ID_TABLE_HEADER_SIZE = len(ID_TABLE_MAGIC) + ID_TABLE_CAPACITY_SIZE + ID_TABLE_COUNT_SIZE
+ID_SLOT_SIZE = 8
+# Initial number of slots of the id table (a power of two), it is doubled when the table gets half full.
+ID_TABLE_MIN_CAPACITY = 1024
+
+DATA_FILE = "blocks.dat"
+INDEX_FILE = "blocks.idx"
+ID_TABLE_FILE = "blocks.ids"
+
+
+@dataclass
+class BlockStore:
+    directory: str
+    # Known accounts by id, used to decode the blocks (see Operation.from_bytes).
+    accounts: Optional[Dict[str, Account]] = field(default=None, repr=False)
+    # fsync every append, turn it off only for throwaway stores.
+    sync: bool = field(default=True)
+
+    __data = None
+    __index = None
+    __data_map: Optional[mmap.mmap] = field(default=None, init=False, repr=False)
+    __index_map: Optional[mmap.mmap] = field(default=None, init=False, repr=False)
+    __count: int = field(default=0, init=False)
+    __ids_map: Optional[mmap.mmap] = field(default=None, init=False, repr=False)
+    __ids_capacity: int = field(default=0, init=False)
+    __cache: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def __post_init__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        data_path = os.path.join(self.directory, DATA_FILE)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        for path in (data_path, index_path):
+            if not os.path.exists(path):
+                with open(path, "wb") as file:
+                    if path == data_path:
+                        file.write(STORE_MAGIC + STORE_VERSION.to_bytes(FILE_HEADER_SIZE - len(STORE_MAGIC), "big"))
+        self.__data = open(data_path, "r+b")
+        self.__index = open(index_path, "r+b")
+
+        header = self.__data.read(FILE_HEADER_SIZE)
+        if header[:len(STORE_MAGIC)] != STORE_MAGIC or \
+                int.from_bytes(header[len(STORE_MAGIC):], "big") != STORE_VERSION:
+            raise ValueError(f"{data_path} is not a block store of version {STORE_VERSION}.")
+        self.__recover()
+
+    def __read_record_header(self, offset: int, data_size: int) -> Optional[int]:
+        """
+        :return: length of the complete and intact block record at the offset, None otherwise.
+        """
+        if offset + RECORD_HEADER_SIZE > data_size:
+            return None
+        self.__data.seek(offset)
+        header = self.__data.read(RECORD_HEADER_SIZE)
+        length = int.from_bytes(header[:RECORD_LENGTH_SIZE], "big")
+        if offset + RECORD_HEADER_SIZE + length > data_size:
+            return None
+        if zlib.crc32(self.__data.read(length)) != int.from_bytes(header[RECORD_LENGTH_SIZE:], "big"):
+            return None
+        return length
+
+    def __recover(self) -> None:
+        data_size = os.fstat(self.__data.fileno()).st_size
+        count = os.fstat(self.__index.fileno()).st_size // INDEX_RECORD_SIZE
+
+        # The index records must point to intact block records, the last ones may be lost in a crash.
+        offset = FILE_HEADER_SIZE
+        while count > 0:
+            self.__index.seek((count - 1) * INDEX_RECORD_SIZE)
+            last_offset = int.from_bytes(self.__index.read(OFFSET_SIZE), "big")
+            length = self.__read_record_header(last_offset, data_size)
+            if length is not None:
+                offset = last_offset + RECORD_HEADER_SIZE + length
+                break
+            count -= 1
+        self.__index.truncate(count * INDEX_RECORD_SIZE)
+
+        # Complete block records written after the last index record are indexed again, the rest is cut off.
+        self.__index.seek(count * INDEX_RECORD_SIZE)
+        while True:
+            length = self.__read_record_header(offset, data_size)
+            if length is None:
+                break
+            self.__data.seek(offset + RECORD_HEADER_SIZE)
+            block_id = bytes.fromhex(Hash.to_sha1(self.__data.read(HEADER_SIZE)))
+            self.__index.write(offset.to_bytes(OFFSET_SIZE, "big") + block_id)
+            offset += RECORD_HEADER_SIZE + length
+            count += 1
+        self.__data.truncate(offset)
+        self.__flush(self.__index)
+        self.__flush(self.__data)
+
+        self.__count = count
+        self.__remap()
+        self.__open_id_table()
+
+    def __flush(self, file) -> None:
+        file.flush()
+        if self.sync:
+            os.fsync(file.fileno())
+
+    def __remap(self) -> None:
+        # The previous maps are not closed: views of blocks read earlier may still refer to them.
+        self.__data_map = mmap.mmap(self.__data.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.__count > 0:
+            self.__index_map = mmap.mmap(self.__index.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __index_record(self, height: int):
+        start = height * INDEX_RECORD_SIZE
+        record = self.__index_map[start:start + INDEX_RECORD_SIZE]
+        return int.from_bytes(record[:OFFSET_SIZE], "big"), record[OFFSET_SIZE:]
+
+    def __open_id_table(self) -> None:
+        path = os.path.join(self.directory, ID_TABLE_FILE)
+        if os.path.exists(path):
+            with open(path, "r+b") as file:
+                header = file.read(ID_TABLE_HEADER_SIZE)
+                capacity = int.from_bytes(header[len(STORE_MAGIC):-ID_TABLE_COUNT_SIZE], "big")
+                inserted = int.from_bytes(header[-ID_TABLE_COUNT_SIZE:], "big")
+                # The table may only lag behind the index, e.g. after a crash between the two writes of an append.
+                if header[:len(ID_TABLE_MAGIC)] == ID_TABLE_MAGIC and capacity >= ID_TABLE_MIN_CAPACITY and \
+                        capacity & (capacity - 1) == 0 and inserted <= self.__count and \
+                        os.fstat(file.fileno()).st_size == ID_TABLE_HEADER_SIZE + capacity * ID_SLOT_SIZE:
+                    self.__ids_map = mmap.mmap(file.fileno(), 0)
+                    self.__ids_capacity = capacity
+                    for height in range(inserted, self.__count):
+                        self.__insert_id(self.__index_record(height)[1], height)
+                    self.__set_ids_count(self.__count)
+                    return
+        self.__rebuild_id_table(ID_TABLE_MIN_CAPACITY)
+
+    def __rebuild_id_table(self, capacity: int) -> None:
+        while self.__count * 2 > capacity:
+            capacity *= 2
+        path = os.path.join(self.directory, ID_TABLE_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(ID_TABLE_MAGIC + capacity.to_bytes(ID_TABLE_CAPACITY_SIZE, "big") +
+                       bytes(ID_TABLE_COUNT_SIZE))
+            file.truncate(ID_TABLE_HEADER_SIZE + capacity * ID_SLOT_SIZE)
+        if self.__ids_map is not None:
+            self.__ids_map.close()
+        os.replace(tmp_path, path)
+        with open(path, "r+b") as file:
+            self.__ids_map = mmap.mmap(file.fileno(), 0)
+        self.__ids_capacity = capacity
+        for height in range(self.__count):
+            self.__insert_id(self.__index_record(height)[1], height)
+        self.__set_ids_count(self.__count)
+
+    def __set_ids_count(self, count: int) -> None:
+        self.__ids_map[ID_TABLE_HEADER_SIZE - ID_TABLE_COUNT_SIZE:ID_TABLE_HEADER_SIZE] = \
+            count.to_bytes(ID_TABLE_COUNT_SIZE, "big")
+        if self.sync:
+            self.__ids_map.flush()
+
+    def __id_slots(self, block_id: bytes) -> Iterator[Tuple[int, Optional[int]]]:
+        """
+        :return: the probed slots of the id table: (position in the file, stored height or None if it is empty).
+        """
+        slot = int.from_bytes(block_id[:ID_SLOT_SIZE], "big") & (self.__ids_capacity - 1)
+        while True:
+            start = ID_TABLE_HEADER_SIZE + slot * ID_SLOT_SIZE
+            value = int.from_bytes(self.__ids_map[start:start + ID_SLOT_SIZE], "big")
+            yield start, value - 1 if value else None
+            slot = (slot + 1) & (self.__ids_capacity - 1)
+
+    def __insert_id(self, block_id: bytes, height: int) -> None:
+        for start, stored in self.__id_slots(block_id):
+            if stored is None:
+                self.__ids_map[start:start + ID_SLOT_SIZE] = (height + 1).to_bytes(ID_SLOT_SIZE, "big")
+                return
+            # Already inserted before a crash (the stored height is checked against the index, see height_of).
+            if stored == height and stored < self.__count and self.__index_record(stored)[1] == block_id:
+                return
+
+    def __len__(self):
+        return self.__count
+
+    def __height(self, height: int) -> int:
+        return range(self.__count)[height]
+
+    def block_bytes(self, height: int) -> memoryview:
+        """
+        :return: the encoded block (Block.to_bytes), a view of the mapped file.
+        """
+        offset, _ = self.__index_record(self.__height(height))
+        length = int.from_bytes(self.__data_map[offset:offset + RECORD_LENGTH_SIZE], "big")
+        start = offset + RECORD_HEADER_SIZE
+        return memoryview(self.__data_map)[start:start + length]
+
+    def view(self, height: int) -> BlockView:
+        """
+        :return: lazy view of the block, nothing is decoded up front (see BlockView).
+        """
+        return BlockView(self.block_bytes(height), self.accounts)
+
+    def __getitem__(self, height: Union[int, slice]) -> Union[Block, List[Block]]:
+        if isinstance(height, slice):
+            return [self[i] for i in range(self.__count)[height]]
+        height = self.__height(height)
+        if height in self.__cache:
+            self.__cache.move_to_end(height)
+            return self.__cache[height]
+        block = Block.from_bytes(self.block_bytes(height), self.accounts)
+        self.__cache[height] = block
+        if len(self.__cache) > BLOCK_CACHE_SIZE:
+            self.__cache.popitem(last=False)
+        return block
+
+    def __iter__(self) -> Iterator[Block]:
+        for height in range(self.__count):
+            yield self[height]
+
+    def __contains__(self, block: Block) -> bool:
+        return block.block_id is not None and self.height_of(block.block_id) is not None
+
+    def height_of(self, block_id: str) -> Optional[int]:
+        """
+        :return: height of the block with the given id, None if it is not in the store.
+        """
+        block_id = bytes.fromhex(block_id)
+        for _, stored in self.__id_slots(block_id):
+            if stored is None:
+                return None
+            # Slots left by a crash may point to a height that now holds another block.
+            if stored < self.__count and self.__index_record(stored)[1] == block_id:
+                return stored
+
+    def append(self, block: Block) -> None:
+        """
+        Writes the block at the end of the store, see the module description for the crash safety.
+        :return: None
+        """
+        encoded = block.to_bytes()
+        offset = self.__data.seek(0, os.SEEK_END)
+        self.__data.write(len(encoded).to_bytes(RECORD_LENGTH_SIZE, "big") +
+                          zlib.crc32(encoded).to_bytes(RECORD_CRC_SIZE, "big") + encoded)
+        self.__flush(self.__data)
+
+        block_id = bytes.fromhex(Hash.to_sha1(block.header()))
+        self.__index.seek(self.__count * INDEX_RECORD_SIZE)
+        self.__index.write(offset.to_bytes(OFFSET_SIZE, "big") + block_id)
+        self.__flush(self.__index)
+
+        self.__count += 1
+        self.__remap()
+        if self.__count * 2 > self.__ids_capacity:
+            self.__rebuild_id_table(self.__ids_capacity * 2)
+        else:
+            self.__insert_id(block_id, self.__count - 1)
+            self.__set_ids_count(self.__count)
+
+    def close(self) -> None:
+        """
+        Closes the files, the store can't be used afterwards.
+        :return: None
+        """
+        self.__cache.clear()
+        self.__data_map = None
+        self.__index_map = None
+        self.__ids_map.close()
+        self.__data.close()
+        self.__index.close()
@@ -0,0 +1,125 @@
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple, Union
+
+from blockchain.account import Account
+from blockchain.block import Block, HEADER_SIZE, TX_COUNT_SIZE, TX_LENGTH_SIZE, VERSION_SIZE, PREV_HASH_SIZE, \
+    TX_ROOT_SIZE, TIMESTAMP_SIZE, TARGET_SIZE, NONCE_SIZE, BLOCK_VERSION
+from blockchain.hash import Hash
+from blockchain.transaction.transaction import Transaction, TRANSACTION_VERSION, SEQUENCE_SIZE
+
+"""
+Lazy decoder of an encoded block (Block.to_bytes) kept in a bytes, memoryview or mmap buffer.
+The header fields are read from the buffer when they are accessed, the transaction ids are hashed straight from
+the buffer, and Transaction objects are only created for the transactions that are accessed.
+"""
+
+# Offsets of the header fields (see blockchain/block.py).
+PREV_HASH_OFFSET = VERSION_SIZE
+TX_ROOT_OFFSET = PREV_HASH_OFFSET + PREV_HASH_SIZE
+TIMESTAMP_OFFSET = TX_ROOT_OFFSET + TX_ROOT_SIZE
+TARGET_OFFSET = TIMESTAMP_OFFSET + TIMESTAMP_SIZE
+NONCE_OFFSET = TARGET_OFFSET + TARGET_SIZE
+
+
+@dataclass
+class BlockView:
+    buffer: Union[bytes, memoryview]
+    # Known accounts by id, used to materialize the transactions (see Operation.from_bytes).
+    accounts: Optional[Dict[str, Account]] = field(default=None, repr=False)
+
+    # (start, end) of every encoded transaction, found on the first access to the transactions.
+    __spans: Optional[List[Tuple[int, int]]] = field(default=None, init=False, repr=False)
+    __transactions: Dict[int, Transaction] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        self.buffer = memoryview(self.buffer)
+        if len(self.buffer) < HEADER_SIZE + TX_COUNT_SIZE:
+            raise ValueError("The encoded block is truncated.")
+        if self.version != BLOCK_VERSION:
+            raise ValueError(f"Unknown block version: {self.version}.")
+
+    def __int_field(self, offset: int, size: int) -> int:
+        return int.from_bytes(self.buffer[offset:offset + size], "big")
+
+    @property
+    def header(self) -> memoryview:
+        return self.buffer[:HEADER_SIZE]
+
+    @property
+    def version(self) -> int:
+        return self.__int_field(0, VERSION_SIZE)
+
+    @property
+    def prev_hash(self) -> str:
+        return "%040x" % self.__int_field(PREV_HASH_OFFSET, PREV_HASH_SIZE)
+
+    @property
+    def transactions_root(self) -> memoryview:
+        return self.buffer[TX_ROOT_OFFSET:TX_ROOT_OFFSET + TX_ROOT_SIZE]
+
+    @property
+    def timestamp(self) -> int:
+        return self.__int_field(TIMESTAMP_OFFSET, TIMESTAMP_SIZE)
+
+    @property
+    def target(self) -> int:
+        return self.__int_field(TARGET_OFFSET, TARGET_SIZE)
+
+    @property
+    def nonce(self) -> int:
+        return self.__int_field(NONCE_OFFSET, NONCE_SIZE)
+
+    @property
+    def block_id(self) -> str:
+        return Hash.new_sha1().update(self.header).hexdigest()
+
+    def __get_spans(self) -> List[Tuple[int, int]]:
+        if self.__spans is None:
+            spans = []
+            offset = HEADER_SIZE + TX_COUNT_SIZE
+            for _ in range(self.__int_field(HEADER_SIZE, TX_COUNT_SIZE)):
+                length = self.__int_field(offset, TX_LENGTH_SIZE)
+                offset += TX_LENGTH_SIZE
+                if len(self.buffer) < offset + length:
+                    raise ValueError("The encoded block is truncated.")
+                spans.append((offset, offset + length))
+                offset += length
+            if offset != len(self.buffer):
+                raise ValueError("Wrong length of the encoded block.")
+            self.__spans = spans
+        return self.__spans
+
+    def __len__(self):
+        return self.__int_field(HEADER_SIZE, TX_COUNT_SIZE)
+
+    def transaction_bytes(self, i: int) -> memoryview:
+        """
+        :return: the encoded transaction (Transaction.to_bytes), a view of the buffer.
+        """
+        start, end = self.__get_spans()[i]
+        return self.buffer[start:end]
+
+    def transaction_id(self, i: int) -> str:
+        """
+        :return: the id of the transaction, hashed from the buffer without decoding it (see Transaction.compute_id).
+        """
+        encoded = self.transaction_bytes(i)
+        return Hash.new_sha1(bytes([TRANSACTION_VERSION])).update(encoded[1 + SEQUENCE_SIZE:]).hexdigest()
+
+    def transaction_ids(self) -> List[str]:
+        return [self.transaction_id(i) for i in range(len(self))]
+
+    def __getitem__(self, i: int) -> Transaction:
+        """
+        :return: the transaction, it is decoded on the first access.
+        """
+        i = range(len(self))[i]
+        if i not in self.__transactions:
+            self.__transactions[i] = Transaction.from_bytes(self.transaction_bytes(i), self.accounts)
+        return self.__transactions[i]
+
+    def to_block(self) -> Block:
+        """
+        :return: the fully decoded block.
+        """
+        return Block.from_bytes(self.buffer, self.accounts)
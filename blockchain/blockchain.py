@@ -1,12 +1,23 @@
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from dataclasses import dataclass, field
 from time import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, Set, Union
 
 from blockchain.account import Account
-from blockchain.block import Block
+from blockchain.block import Block, NONCE_SIZE
+from blockchain.block_store import BlockStore
+from blockchain.chain_index import ChainIndex
 from blockchain.hash import Hash
+from blockchain.key_image import KeyImageStore
+from blockchain.sha1_batch import SHA1NonceKernel, BATCH_SIZE
+from blockchain.snapshot import StateSnapshot, save_snapshot, load_snapshot, append_key_image, load_key_images, \
+    clear_key_images
 from blockchain.transaction.transaction import Transaction
+from signature_algorithms.curve import Point
+from signature_algorithms.linkable_ring_signature import LinkableRingSignature
 
 """
 This is the first attempt to use blockchain. 
@@ -15,6 +26,58 @@ We will have to do a lot of optimizations in the future for better performance!
 
 GENESIS_BLOCK_PREV_HASH = '0x00000000000000000000000000000000000000000000'
 
+# Number of nonces tried between checks of the stop event while mining.
+MINING_CHECK_INTERVAL = 4096
+# Seconds between checks of the cancel event while the worker processes are mining.
+MINING_POLL_INTERVAL = 0.05
+
+# Mining engines: the scalar loop over the hash midstate or the NumPy batch kernel (blockchain/sha1_batch.py).
+SCALAR_ENGINE = "scalar"
+NUMPY_ENGINE = "numpy"
+
+
+def find_nonce(header_prefix: bytes, target: int, start: int, step: int, stop=None,
+               engine: str = SCALAR_ENGINE) -> Optional[int]:
+    """
+    Tries the nonces start, start + step, start + 2 * step, ... with the midstate of the header prefix.
+    :param stop: event (threading or multiprocessing), the search gives up once it is set.
+    :param engine: SCALAR_ENGINE or NUMPY_ENGINE.
+    :return: the first nonce giving a block id below the target, None if stopped.
+    """
+    if engine == NUMPY_ENGINE:
+        kernel = SHA1NonceKernel(header_prefix)
+        nonce = start
+        while stop is None or not stop.is_set():
+            found = kernel.search_range(nonce, step, BATCH_SIZE, target)
+            if found is not None:
+                return found
+            nonce += step * BATCH_SIZE
+        return None
+    if engine != SCALAR_ENGINE:
+        raise ValueError(f"Unknown mining engine: {engine}")
+
+    midstate = Hash.new_sha1(header_prefix)
+    nonce = start
+    while stop is None or not stop.is_set():
+        end = nonce + step * MINING_CHECK_INTERVAL
+        for candidate in range(nonce, end, step):
+            if int(midstate.copy().update(candidate.to_bytes(NONCE_SIZE, "big")).hexdigest(), 16) < target:
+                return candidate
+        nonce = end
+    return None
+
+
+def mining_worker(header_prefix: bytes, target: int, start: int, step: int, stop, results,
+                  engine: str = SCALAR_ENGINE) -> None:
+    """
+    Task of a mining process: it searches its share of the nonces and reports the first valid one,
+    then stops the other workers.
+    """
+    nonce = find_nonce(header_prefix, target, start, step, stop, engine)
+    if nonce is not None:
+        results.put(nonce)
+        stop.set()
+
 
 @dataclass
 class Blockchain:
@@ -23,16 +86,37 @@ class Blockchain:
     coin_database: Optional[Dict] = field(default=None)
 
     # An array containing all blocks added to the history.
-    block_history: Optional[List[Block]] = field(default=None)
+    # A BlockStore can be passed instead to keep the history on disk, a non-empty one is replayed on start.
+    block_history: Optional[Union[List[Block], BlockStore]] = field(default=None)
 
-    # An array storing all the transactions in the history.
+    # A set storing the ids of all the transactions in the history.
     # This will be used for quicker access when checking the
     # existence of a transaction in the history (duplicate protection).
-    tx_database: Optional[List[Transaction]] = field(default=None)
+    tx_database: Optional[Set[str]] = field(default=None)
+
+    # Key images of the accepted linkable ring signatures (double-signing protection).
+    # They are only kept across restarts with snapshot_dir (see blockchain/snapshot.py).
+    key_images: Optional[KeyImageStore] = field(default=None)
 
     # An integer value defining the number of coins available in the tap for testing.
     faucetCoins: int = field(default=100)
 
+    # Number of worker processes used to check the signatures of a block, 0 means the checks run in this process.
+    verify_workers: int = field(default=0)
+    __executor: Optional[ProcessPoolExecutor] = field(default=None, init=False, repr=False)
+
+    # Directory of the state snapshots (blockchain/snapshot.py), None disables them.
+    # On start the latest snapshot matching the history is loaded and only the blocks after it are replayed.
+    snapshot_dir: Optional[str] = field(default=None)
+    # A snapshot is written every snapshot_interval blocks added to the history, it must be positive.
+    snapshot_interval: int = field(default=100)
+    # True once the key image log of snapshot_dir is merged into key_images, only then can a snapshot replace it.
+    __key_image_log_merged: bool = field(default=False, init=False, repr=False)
+
+    # Optional SQLite index of the history (blockchain/chain_index.py), it is brought up to date on start
+    # (rebuilt if it was built from another history, e.g. a list history always starts with a new genesis block).
+    chain_index: Optional[ChainIndex] = field(default=None)
+
     def get_block_history(self):
         print("\n\nStart block history")
         print("-" * 20, end='\n')
@@ -43,10 +127,22 @@ class Blockchain:
         print("End block history\n\n")
 
     def __post_init__(self):
+        if self.snapshot_interval <= 0:
+            raise ValueError("snapshot_interval must be positive.")
         self.coin_database = dict()
-        self.block_history = []
-        self.tx_database = []
-        self.__init_blockchain()
+        if self.block_history is None:
+            self.block_history = []
+        self.tx_database = set()
+        self.key_images = KeyImageStore()
+        if len(self.block_history) == 0:
+            # A new history: a non-empty key image log of snapshot_dir belongs to another one and is kept.
+            self.__key_image_log_merged = self.snapshot_dir is None or not load_key_images(self.snapshot_dir)
+            self.__sync_chain_index()
+            self.__init_blockchain()
+        else:
+            for height in range(self.__restore_snapshot(), len(self.block_history)):
+                self.__apply_block(self.block_history[height])
+            self.__sync_chain_index()
 
     def __init_blockchain(self, emission_value: int = 50) -> None:
         """
@@ -55,19 +151,54 @@ class Blockchain:
         :return:
         """
         creator = Account().get_account()
-        self.coin_database[creator.account_id] = creator.get_balance
         genesis_block = ConsensusAlgorithms(emission_value).proof_of_work(Block(timestamp=int(time()),
                                                                                 prev_hash=GENESIS_BLOCK_PREV_HASH),
                                                                           creator)
 
-        self.tx_database.extend(genesis_block.set_of_transactions)
+        # The same state as the one replayed from a stored history: the creator is credited with the coinbase.
+        self.__apply_block(genesis_block)
         self.block_history.append(genesis_block)
+        if self.chain_index is not None:
+            self.chain_index.add_block(genesis_block, 0)
+
+    def get_executor(self) -> Optional[ProcessPoolExecutor]:
+        """
+        :return: the process pool for signature checks, it is started on the first call if verify_workers > 0.
+        """
+        if self.verify_workers > 0 and self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max_workers=self.verify_workers)
+        return self.__executor
+
+    def close(self) -> None:
+        """
+        Stops the worker processes (if any).
+        :return: Nothings.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
 
     def get_lat_block(self) -> Optional[Block]:
         if self.block_history is not None:
             return self.block_history[-1]
         return None
 
+    def has_block(self, block: Block) -> bool:
+        """
+        :return: true if the block is in the history (looked up by id in the index or in a block store).
+        """
+        if self.chain_index is not None:
+            return self.chain_index.block_height(block.block_id) is not None
+        return block in self.block_history
+
+    def has_transaction(self, transaction: Transaction) -> bool:
+        """
+        :return: true if the transaction is in the history.
+        """
+        if self.chain_index is not None:
+            return self.chain_index.transaction_location(transaction.transaction_id) is not None
+        return transaction.transaction_id in self.tx_database
+
     def get_token_from_faucet(self, account: Account, amount: int) -> bool:
         """
         A function to retrieve test coins from the tap.
@@ -100,10 +231,10 @@ class Blockchain:
             return False
 
         for tx in block_to_add.set_of_transactions:
-            if tx in self.tx_database:
+            if tx.transaction_id in self.tx_database:
                 return False
 
-        if not block_to_add.verify_block():
+        if not block_to_add.verify_block(self.get_executor()):
             return False
 
         for tx in block_to_add.set_of_transactions:
@@ -113,7 +244,99 @@ class Blockchain:
                 self.coin_database[op.receiver.account_id] += op.amount
 
         self.block_history.append(block_to_add)
-        self.tx_database.extend(block_to_add.set_of_transactions)
+        self.tx_database.update(tx.transaction_id for tx in block_to_add.set_of_transactions)
+        if self.chain_index is not None:
+            self.chain_index.add_block(block_to_add, len(self.block_history) - 1)
+        if self.snapshot_dir is not None and len(self.block_history) % self.snapshot_interval == 0:
+            self.save_snapshot()
+        return True
+
+    def __apply_block(self, block: Block) -> None:
+        """
+        Replays a block of the stored history: its transactions and the balance changes of its operations.
+        Balances given to accounts outside the history (add_account) are not known here and start at 0.
+        :return: Nothings.
+        """
+        for tx in block.set_of_transactions:
+            for op in tx.set_of_operations:
+                if tx.sequence != -1:
+                    sender_id = op.sender.account_id
+                    self.coin_database[sender_id] = self.coin_database.get(sender_id, 0) - op.amount
+                receiver_id = op.receiver.account_id
+                self.coin_database[receiver_id] = self.coin_database.get(receiver_id, 0) + op.amount
+        self.tx_database.update(tx.transaction_id for tx in block.set_of_transactions)
+
+    def __sync_chain_index(self) -> None:
+        """
+        Brings the index up to date with the history. The index is trusted only if its last block is the block of
+        the history at that height, otherwise (another or a shorter history, e.g. a new genesis block) it is
+        cleared and rebuilt.
+        :return: Nothings.
+        """
+        if self.chain_index is None:
+            return
+        indexed = len(self.chain_index)
+        if indexed > len(self.block_history) or \
+                (indexed > 0 and self.chain_index.block_id(indexed - 1) != self.block_history[indexed - 1].block_id):
+            self.chain_index.clear()
+            indexed = 0
+        for height in range(indexed, len(self.block_history)):
+            self.chain_index.add_block(self.block_history[height], height)
+
+    def __restore_snapshot(self) -> int:
+        """
+        Loads the latest snapshot if it was taken from this history (its tip is the block at its height).
+        :return: number of blocks covered by the loaded state, 0 if there is no such snapshot.
+        """
+        if self.snapshot_dir is None:
+            return 0
+        snapshot = load_snapshot(self.snapshot_dir, len(self.block_history))
+        if snapshot is not None and (snapshot.height == 0 or
+                                     self.block_history[snapshot.height - 1].block_id != snapshot.tip_hash):
+            # Taken from another history: neither its state nor the key images logged after it belong to this one.
+            return 0
+        # The key images can't be replayed from the blocks: those of the snapshot and the ones logged after it.
+        self.key_images.images.update(load_key_images(self.snapshot_dir))
+        self.__key_image_log_merged = True
+        if snapshot is None:
+            return 0
+        self.key_images.images.update(snapshot.key_images)
+        self.coin_database = snapshot.coin_database
+        self.tx_database = snapshot.tx_ids
+        self.faucetCoins = snapshot.faucet_coins
+        return snapshot.height
+
+    def save_snapshot(self) -> Optional[str]:
+        """
+        Writes a snapshot of the current state to snapshot_dir.
+        :return: path of the snapshot file, None if snapshots are disabled.
+        """
+        if self.snapshot_dir is None:
+            return None
+        snapshot = StateSnapshot(len(self.block_history), self.get_lat_block().block_id, dict(self.coin_database),
+                                 set(self.tx_database), set(self.key_images.images), self.faucetCoins)
+        path = save_snapshot(self.snapshot_dir, snapshot)
+        # The logged images are in the snapshot only if the log was merged, otherwise they are kept.
+        if self.__key_image_log_merged:
+            clear_key_images(self.snapshot_dir)
+        return path
+
+    def accept_ring_signature(self, msg: str, public_keys: list, signature: Tuple[int, list, Point]) -> bool:
+        """
+        Accepts a linkable ring signature (e.g. an anonymous bid) once per key: the signature must be valid and
+        its key image must not have been seen before. The image is recorded on success, and also logged to
+        snapshot_dir if it is set, so it is still known after a restart.
+        :return: true if the signature is accepted.
+        """
+        key_image = signature[2]
+        if key_image in self.key_images:
+            return False
+        if not LinkableRingSignature().verify(msg, public_keys, *signature):
+            return False
+        if not self.key_images.add(key_image):
+            return False
+        if self.snapshot_dir is not None:
+            append_key_image(self.snapshot_dir, key_image.to_bytes())
         return True
 
     def get_account_state(self) -> Dict:
@@ -134,13 +357,56 @@ class Blockchain:
 @dataclass
 class ConsensusAlgorithms:
     emission_value: int = field(default=50, init=True)
+    # Number of worker processes searching the nonces, 0 means the search runs in this process.
+    workers: int = field(default=0)
+    # How the nonces are hashed: SCALAR_ENGINE or NUMPY_ENGINE.
+    engine: str = field(default=SCALAR_ENGINE)
 
-    def proof_of_work(self, block: Block, miner: Account) -> Block:
+    def proof_of_work(self, block: Block, miner: Account, cancel=None) -> Optional[Block]:
+        """
+        Everything but the nonce is hashed once, each attempt continues from a copy of that state.
+        With workers > 0 the nonces are interleaved between the processes, the first one to find a valid nonce
+        stops the others.
+        :param cancel: event (threading or multiprocessing) to abandon the search, e.g. when a competing block
+        arrives.
+        :return: the mined block, None if the search was cancelled.
+        """
         block.add_coinbase_transaction(miner, self.emission_value)
-        block.get_new_block_id(Hash.to_sha1)
-        while block.target < int(block.block_id, 16):
-            block.get_new_block_id(Hash.to_sha1)
-            # print(hex(block.target))
-            # print(block.block_id)
+        header_prefix = block.header_prefix()
+        if self.workers > 0:
+            nonce = self.__find_nonce_in_parallel(header_prefix, block.target, block.nonce + 1, cancel)
+        else:
+            nonce = find_nonce(header_prefix, block.target, block.nonce + 1, 1, cancel, self.engine)
+        if nonce is None:
+            return None
 
+        block.nonce = nonce
+        block.block_id = Hash.to_sha1(block.header())
         return block.create_block()
+
+    def __find_nonce_in_parallel(self, header_prefix: bytes, target: int, start: int, cancel) -> Optional[int]:
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        results = context.Queue()
+        processes = [context.Process(target=mining_worker,
+                                     args=(header_prefix, target, start + i, self.workers, stop, results, self.engine),
+                                     daemon=True)
+                     for i in range(self.workers)]
+        for process in processes:
+            process.start()
+
+        nonce = None
+        try:
+            while nonce is None:
+                try:
+                    nonce = results.get(timeout=MINING_POLL_INTERVAL)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        break
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        raise RuntimeError("The mining processes have stopped without a result.")
+        finally:
+            stop.set()
+            for process in processes:
+                process.join()
+        return nonce
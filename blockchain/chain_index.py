@@ -0,0 +1,117 @@
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
+
+from blockchain.block import Block
+
+"""
+Optional SQLite index of the block history for point lookups (B-tree, logarithmic in the length of the history):
+block id -> height, transaction id -> (height, position in the block), account id -> ids of its transactions
+(as the sender or the receiver of an operation).
+The ids are stored as binary blobs. All the rows of a block are written in one SQLite transaction, so the index
+never holds part of a block. It sits alongside the history (see Blockchain.chain_index).
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    block_id BLOB PRIMARY KEY,
+    height INTEGER NOT NULL UNIQUE
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id BLOB PRIMARY KEY,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS account_transactions (
+    account_id BLOB NOT NULL,
+    tx_id BLOB NOT NULL,
+    PRIMARY KEY (account_id, tx_id)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class ChainIndex:
+    # Path of the database file, ":memory:" keeps the index in memory.
+    path: str = field(default=":memory:")
+
+    __connection: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self.__connection = sqlite3.connect(self.path)
+        self.__connection.executescript(SCHEMA)
+
+    def __len__(self):
+        """
+        :return: number of indexed blocks, the blocks of heights 0 .. len - 1.
+        """
+        return self.__connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def add_block(self, block: Block, height: int) -> None:
+        """
+        Indexes the block and its transactions in one SQLite transaction.
+        :return: None
+        """
+        transactions = []
+        accounts = set()
+        for position, tx in enumerate(block.set_of_transactions):
+            tx_id = bytes.fromhex(tx.transaction_id)
+            transactions.append((tx_id, height, position))
+            for op in tx.set_of_operations:
+                accounts.add((bytes.fromhex(op.sender.account_id), tx_id))
+                accounts.add((bytes.fromhex(op.receiver.account_id), tx_id))
+
+        with self.__connection:
+            self.__connection.execute("INSERT INTO blocks (block_id, height) VALUES (?, ?)",
+                                      (bytes.fromhex(block.block_id), height))
+            self.__connection.executemany("INSERT OR IGNORE INTO transactions (tx_id, height, position) "
+                                          "VALUES (?, ?, ?)", transactions)
+            self.__connection.executemany("INSERT OR IGNORE INTO account_transactions (account_id, tx_id) "
+                                          "VALUES (?, ?)", accounts)
+
+    def block_id(self, height: int) -> Optional[str]:
+        """
+        :return: id of the indexed block at the height, None if there is none.
+        """
+        row = self.__connection.execute("SELECT block_id FROM blocks WHERE height = ?", (height,)).fetchone()
+        return row[0].hex() if row else None
+
+    def clear(self) -> None:
+        """
+        Removes all the rows, e.g. when the index was built from another history.
+        :return: None
+        """
+        with self.__connection:
+            for table in ("blocks", "transactions", "account_transactions"):
+                self.__connection.execute(f"DELETE FROM {table}")
+
+    def block_height(self, block_id: str) -> Optional[int]:
+        """
+        :return: height of the block, None if it is not indexed.
+        """
+        row = self.__connection.execute("SELECT height FROM blocks WHERE block_id = ?",
+                                        (bytes.fromhex(block_id),)).fetchone()
+        return row[0] if row else None
+
+    def transaction_location(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        """
+        :return: (height of the block, position in the block) of the transaction, None if it is not indexed.
+        """
+        row = self.__connection.execute("SELECT height, position FROM transactions WHERE tx_id = ?",
+                                        (bytes.fromhex(tx_id),)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def account_transactions(self, account_id: str) -> List[str]:
+        """
+        :return: ids of the transactions with an operation sent or received by the account.
+        """
+        rows = self.__connection.execute("SELECT tx_id FROM account_transactions WHERE account_id = ?",
+                                         (bytes.fromhex(account_id),))
+        return [row[0].hex() for row in rows]
+
+    def close(self) -> None:
+        """
+        Closes the database, the index can't be used afterwards.
+        :return: None
+        """
+        self.__connection.close()
@@ -1,25 +1,205 @@
+import hashlib
 from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
 from hash_lib import Keccak, SHA1
 
+"""
+Hash backends. Every algorithm has a registry of implementations (name -> function bytes -> hex digest),
+the first available one in the order of preference is selected at import time:
+SHA-1: hashlib (C implementation, always available), then my own implementation from hash_lib.
+Keccak-256: pycryptodome or pysha3 when one of them is installed, then hash_lib.
+Note that hashlib.sha3_256 is not Keccak-256 (the padding differs), so it can't be used here.
+All backends must give identical digests, see tests/hash/test_backends.py.
+
+A backend may also provide a factory of incremental hash objects (hashlib-like: update, copy, digest, hexdigest)
+used by Hasher. Without it Hasher buffers the data and hashes it at once when the digest is requested.
+"""
+
+SHA1_ALGORITHM = "sha1"
+KECCAK_ALGORITHM = "keccak256"
+
+HASHLIB = "hashlib"
+PYCRYPTODOME = "pycryptodome"
+PYSHA3 = "pysha3"
+HASH_LIB = "hash_lib"
+
+_backends: Dict[str, Dict[str, Callable[[bytes], str]]] = {SHA1_ALGORITHM: {}, KECCAK_ALGORITHM: {}}
+_incremental: Dict[str, Dict[str, Callable]] = {SHA1_ALGORITHM: {}, KECCAK_ALGORITHM: {}}
+_selected: Dict[str, str] = {}
+
+
+def register_backend(algorithm: str, name: str, func: Callable[[bytes], str], preferred: bool = False,
+                     new: Optional[Callable] = None) -> None:
+    """
+    Adds an implementation of the algorithm, it is selected if it is preferred or the first one registered.
+    :param func: function returning the hex digest of the given bytes.
+    :param new: factory of incremental hash objects with update, copy, digest and hexdigest (optional).
+    :return: None
+    """
+    _backends[algorithm][name] = func
+    if new is not None:
+        _incremental[algorithm][name] = new
+    if preferred or algorithm not in _selected:
+        _selected[algorithm] = name
+
+
+def available_backends(algorithm: str) -> List[str]:
+    """
+    :return: names of the registered implementations of the algorithm in the order of preference.
+    """
+    return list(_backends[algorithm])
+
+
+def get_backend(algorithm: str) -> str:
+    """
+    :return: name of the implementation in use.
+    """
+    return _selected[algorithm]
+
+
+def set_backend(algorithm: str, name: str) -> None:
+    """
+    Switch the implementation of the algorithm, the name must be one of available_backends(algorithm).
+    :return: None
+    """
+    if name not in _backends[algorithm]:
+        raise ValueError(f"Backend {name} is not available for {algorithm}.")
+    _selected[algorithm] = name
+
+
+def hex_digest(algorithm: str, data: bytes) -> str:
+    """
+    :return: hex digest of the data computed by the selected implementation.
+    """
+    return _backends[algorithm][_selected[algorithm]](data)
+
+
+register_backend(SHA1_ALGORITHM, HASHLIB, lambda data: hashlib.sha1(data).hexdigest(), new=hashlib.sha1)
+register_backend(SHA1_ALGORITHM, HASH_LIB, lambda data: SHA1().update(data))
+
+try:
+    from Crypto.Hash import keccak as _pycryptodome_keccak
+
+    register_backend(KECCAK_ALGORITHM, PYCRYPTODOME,
+                     lambda data: _pycryptodome_keccak.new(data=data, digest_bits=256).hexdigest())
+except ImportError:
+    pass
+
+try:
+    import sha3 as _pysha3
+
+    register_backend(KECCAK_ALGORITHM, PYSHA3, lambda data: _pysha3.keccak_256(data).hexdigest(),
+                     new=_pysha3.keccak_256)
+except ImportError:
+    pass
+
+register_backend(KECCAK_ALGORITHM, HASH_LIB, lambda data: Keccak().update(data))
+
+
+class Hasher:
+    """
+    Incremental hasher: the data can be fed in parts, and copy() forks the state.
+    With a backend that has an incremental factory (hashlib SHA-1, pysha3 Keccak) the state is a real midstate,
+    so a common prefix (e.g. a block header without the nonce) is hashed once and every variation only hashes
+    its own tail. The other backends (hash_lib, pycryptodome Keccak, whose state can't be copied) only buffer
+    the data: the results are the same, but every digest hashes the whole input again (see incremental).
+    The backend is the one selected for the algorithm when the hasher is created.
+    """
+    __slots__ = ("algorithm", "backend", "_state", "_buffer")
+
+    def __init__(self, algorithm: str, data: bytes = b""):
+        self.algorithm = algorithm
+        self.backend = _selected[algorithm]
+        new = _incremental[algorithm].get(self.backend)
+        # Either a native incremental object or the buffered data for a one-shot backend.
+        self._state = new() if new is not None else None
+        self._buffer = bytearray() if new is None else None
+        if data:
+            self.update(data)
+
+    @property
+    def incremental(self) -> bool:
+        """
+        :return: true if the backend keeps a native midstate, false if the data is buffered.
+        """
+        return self._state is not None
+
+    def update(self, data: bytes) -> "Hasher":
+        """
+        Feeds more data.
+        :return: the hasher itself.
+        """
+        if self._state is not None:
+            self._state.update(data)
+        else:
+            self._buffer += data
+        return self
+
+    def copy(self) -> "Hasher":
+        """
+        :return: independent hasher with the same state.
+        """
+        other = Hasher.__new__(Hasher)
+        other.algorithm = self.algorithm
+        other.backend = self.backend
+        other._state = self._state.copy() if self._state is not None else None
+        other._buffer = bytearray(self._buffer) if self._buffer is not None else None
+        return other
+
+    def hexdigest(self) -> str:
+        """
+        :return: hex digest of the data fed so far, the hasher can still be updated afterwards.
+        """
+        if self._state is not None:
+            return self._state.hexdigest()
+        return _backends[self.algorithm][self.backend](bytes(self._buffer))
+
+    def digest(self) -> bytes:
+        """
+        :return: digest of the data fed so far.
+        """
+        if self._state is not None:
+            return self._state.digest()
+        return bytes.fromhex(self.hexdigest())
+
 
 @dataclass
 class Hash:
     @staticmethod
-    def to_sha1(message: str) -> str:
+    def to_sha1(message: Union[str, bytes]) -> str:
         """
         Produce a hex SHA-1 digest of the input message.
 
-        :param message: plain text
+        :param message: plain text or bytes
         :return: the final hash value (big-endian) as a hex string
         """
-        return SHA1().update(message.encode())
+        if isinstance(message, str):
+            message = message.encode()
+        return hex_digest(SHA1_ALGORITHM, message)
 
     @staticmethod
-    def to_keccak(message: str) -> str:
+    def to_keccak(message: Union[str, bytes]) -> str:
         """
         Produce a hex Keccak-256 digest of the input message.
 
-        :param message: plain text
+        :param message: plain text or bytes
         :return: the final hash value (big-endian) as a hex string
         """
-        return Keccak().update(message.encode())
+        if isinstance(message, str):
+            message = message.encode()
+        return hex_digest(KECCAK_ALGORITHM, message)
+
+    @staticmethod
+    def new_sha1(data: bytes = b"") -> Hasher:
+        """
+        :return: incremental SHA-1 hasher (see Hasher).
+        """
+        return Hasher(SHA1_ALGORITHM, data)
+
+    @staticmethod
+    def new_keccak(data: bytes = b"") -> Hasher:
+        """
+        :return: incremental Keccak-256 hasher (see Hasher).
+        """
+        return Hasher(KECCAK_ALGORITHM, data)
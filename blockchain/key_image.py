@@ -0,0 +1,37 @@
+from dataclasses import dataclass, field
+from typing import Optional, Set
+
+from signature_algorithms.curve import Point
+
+"""
+The key images of the linkable ring signatures (signature_algorithms/linkable_ring_signature.py) accepted so far.
+They are kept encoded in a hash set, so checking whether a key has already signed is a single lookup
+whatever the length of the history.
+"""
+
+
+@dataclass
+class KeyImageStore:
+    # Encoded key images (Point.to_bytes).
+    images: Optional[Set[bytes]] = field(default=None)
+
+    def __post_init__(self):
+        if self.images is None:
+            self.images = set()
+
+    def __len__(self):
+        return len(self.images)
+
+    def __contains__(self, key_image: Point) -> bool:
+        return key_image.to_bytes() in self.images
+
+    def add(self, key_image: Point) -> bool:
+        """
+        Records the key image.
+        :return: false if it has already been recorded, i.e. the key has signed before.
+        """
+        encoded = key_image.to_bytes()
+        if encoded in self.images:
+            return False
+        self.images.add(encoded)
+        return True
@@ -0,0 +1,129 @@
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from blockchain.block import NONCE_SIZE
+
+"""
+SHA-1 of one block header for a whole batch of nonces at once, with NumPy uint32 arrays (one element per nonce).
+The full 64-byte blocks of the header prefix are the same for every nonce, they are compressed once (the midstate);
+only the last block(s) with the nonce and the padding are compressed for the batch.
+https://en.wikipedia.org/wiki/SHA-1#SHA-1_pseudocode
+It is a mining engine of ConsensusAlgorithms, the results must match Hash.to_sha1 (see tests/hash/test_sha1_batch.py).
+"""
+
+# Number of nonces hashed by one call of the kernel when mining.
+BATCH_SIZE = 16384
+
+SHA1_INIT = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+SHA1_BLOCK_SIZE = 64
+
+
+def _rotl(x, n: int):
+    return (x << np.uint32(n)) | (x >> np.uint32(32 - n))
+
+
+def _compress(state: list, block) -> list:
+    """
+    :param state: five uint32 arrays (or arrays broadcastable to the batch).
+    :param block: uint32 array (batch, 16) of big-endian message words.
+    :return: the new state.
+    """
+    w = [block[:, i] for i in range(16)]
+    for i in range(16, 80):
+        w.append(_rotl(w[i - 3] ^ w[i - 8] ^ w[i - 14] ^ w[i - 16], 1))
+
+    a, b, c, d, e = state
+    for i in range(80):
+        if i < 20:
+            f = (b & c) | (~b & d)
+            k = np.uint32(0x5A827999)
+        elif i < 40:
+            f = b ^ c ^ d
+            k = np.uint32(0x6ED9EBA1)
+        elif i < 60:
+            f = (b & c) | (b & d) | (c & d)
+            k = np.uint32(0x8F1BBCDC)
+        else:
+            f = b ^ c ^ d
+            k = np.uint32(0xCA62C1D6)
+        a, b, c, d, e = _rotl(a, 5) + f + e + k + w[i], a, _rotl(b, 30), c, d
+    return [state[0] + a, state[1] + b, state[2] + c, state[3] + d, state[4] + e]
+
+
+class SHA1NonceKernel:
+    """
+    Hashes header_prefix + nonce (NONCE_SIZE bytes, big-endian) for arrays of nonces.
+    """
+
+    def __init__(self, header_prefix: bytes):
+        if np is None:
+            raise RuntimeError("The numpy mining engine requires numpy.")
+        full = len(header_prefix) // SHA1_BLOCK_SIZE * SHA1_BLOCK_SIZE
+        state = [np.array([v], dtype=np.uint32) for v in SHA1_INIT]
+        for offset in range(0, full, SHA1_BLOCK_SIZE):
+            block = np.frombuffer(header_prefix[offset:offset + SHA1_BLOCK_SIZE], dtype=">u4").astype(np.uint32)
+            state = _compress(state, block.reshape(1, 16))
+        self.midstate = state
+
+        # The tail: the rest of the prefix, the nonce, 0x80, zeros and the message length in bits.
+        tail_size = len(header_prefix) - full + NONCE_SIZE
+        padded_size = (tail_size + 8) // SHA1_BLOCK_SIZE * SHA1_BLOCK_SIZE + SHA1_BLOCK_SIZE
+        tail = bytearray(padded_size)
+        tail[:len(header_prefix) - full] = header_prefix[full:]
+        tail[tail_size] = 0x80
+        tail[-8:] = ((len(header_prefix) + NONCE_SIZE) * 8).to_bytes(8, "big")
+        self.tail = np.frombuffer(bytes(tail), dtype=np.uint8)
+        self.nonce_offset = len(header_prefix) - full
+
+    def digests(self, nonces) -> "np.ndarray":
+        """
+        :param nonces: array of nonces (uint64).
+        :return: uint32 array (len(nonces), 5), the digests as big-endian words.
+        """
+        nonces = np.asarray(nonces, dtype=np.uint64)
+        data = np.tile(self.tail, (len(nonces), 1))
+        for i in range(NONCE_SIZE):
+            shift = np.uint64(8 * (NONCE_SIZE - 1 - i))
+            data[:, self.nonce_offset + i] = (nonces >> shift) & np.uint64(0xff)
+        words = data.view(">u4").astype(np.uint32)
+
+        state = self.midstate
+        for offset in range(0, words.shape[1], 16):
+            state = _compress(state, words[:, offset:offset + 16])
+        return np.stack(np.broadcast_arrays(*state), axis=1)
+
+    def search(self, nonces, target: int) -> Optional[int]:
+        """
+        :return: the first nonce of the array whose digest is below the target, None if there is none.
+        """
+        if target >= 1 << 160:
+            return int(nonces[0])
+        digests = self.digests(nonces)
+        target_words = [(target >> (32 * (4 - i))) & 0xffffffff for i in range(5)]
+        # Lexicographic comparison of the five words.
+        less = np.zeros(len(digests), dtype=bool)
+        equal = np.ones(len(digests), dtype=bool)
+        for i in range(5):
+            less |= equal & (digests[:, i] < target_words[i])
+            equal &= digests[:, i] == target_words[i]
+        found = np.flatnonzero(less)
+        return int(nonces[found[0]]) if len(found) else None
+
+    def search_range(self, start: int, step: int, count: int, target: int) -> Optional[int]:
+        """
+        :return: the first of the nonces start, start + step, ..., start + (count - 1) * step whose digest is below
+        the target, None if there is none.
+        """
+        nonces = np.uint64(start) + np.uint64(step) * np.arange(count, dtype=np.uint64)
+        return self.search(nonces, target)
+
+
+def digest_to_hex(digest) -> str:
+    """
+    :return: hex string of a digest returned by SHA1NonceKernel.digests, as Hash.to_sha1 gives it.
+    """
+    return "".join("%08x" % int(word) for word in digest)
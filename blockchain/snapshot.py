@@ -0,0 +1,198 @@
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Set, List
+
+from blockchain.account import ACCOUNT_ID_SIZE
+from blockchain.block_store import BLOCK_ID_SIZE
+
+"""
+Snapshots of the state derived from the block history, so a node starts from the latest one and only replays
+the blocks added after it (see Blockchain.__post_init__).
+Binary layout: magic | version | height | tip block id | faucet coins | accounts count | (account id | balance)... |
+transactions count | transaction id... | key images count | key image... | CRC-32 of everything before it.
+A snapshot is written to a temporary file that is synced and then renamed, so a crash never leaves a partial one
+under the final name; a snapshot that doesn't pass the checks is skipped when loading.
+
+The key images accepted by Blockchain.accept_ring_signature are not part of any block, so they can't be replayed:
+each one is appended (and synced) to a log in the same directory when it is accepted, and the log is emptied once
+a snapshot holding the images is written.
+"""
+
+SNAPSHOT_MAGIC = b"BBSS"
+SNAPSHOT_VERSION = 1
+VERSION_SIZE = 1
+HEIGHT_SIZE = 8
+FAUCET_SIZE = 8
+COUNT_SIZE = 4
+# Signed, a replayed balance can go below zero when the account got coins outside the history (add_account).
+BALANCE_SIZE = 8
+TX_ID_SIZE = 20
+KEY_IMAGE_SIZE = 33
+CRC_SIZE = 4
+# Number of the most recent snapshots kept in the directory.
+SNAPSHOTS_KEPT = 2
+
+SNAPSHOT_FILE = "snapshot-%012d.bin"
+KEY_IMAGE_LOG_FILE = "key_images.log"
+SNAPSHOT_FILE_PATTERN = re.compile(r"snapshot-(\d{12})\.bin")
+
+
+@dataclass
+class StateSnapshot:
+    # Number of blocks of the history the state was built from.
+    height: int = field(default=0)
+    # Id of the last of these blocks.
+    tip_hash: str = field(default="")
+    coin_database: Dict[str, int] = field(default_factory=dict)
+    # Ids of the transactions in the history.
+    tx_ids: Set[str] = field(default_factory=set)
+    # Encoded key images (see KeyImageStore).
+    key_images: Set[bytes] = field(default_factory=set)
+    faucet_coins: int = field(default=0)
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the snapshot, see the module description.
+        :return: bytes.
+        """
+        parts = [SNAPSHOT_MAGIC, SNAPSHOT_VERSION.to_bytes(VERSION_SIZE, "big"),
+                 self.height.to_bytes(HEIGHT_SIZE, "big"), bytes.fromhex(self.tip_hash),
+                 self.faucet_coins.to_bytes(FAUCET_SIZE, "big"), len(self.coin_database).to_bytes(COUNT_SIZE, "big")]
+        for account_id, balance in self.coin_database.items():
+            parts.append(bytes.fromhex(account_id))
+            parts.append(balance.to_bytes(BALANCE_SIZE, "big", signed=True))
+        parts.append(len(self.tx_ids).to_bytes(COUNT_SIZE, "big"))
+        parts.extend(bytes.fromhex(tx_id) for tx_id in self.tx_ids)
+        parts.append(len(self.key_images).to_bytes(COUNT_SIZE, "big"))
+        parts.extend(self.key_images)
+        data = b"".join(parts)
+        return data + zlib.crc32(data).to_bytes(CRC_SIZE, "big")
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "StateSnapshot":
+        """
+        Decode a snapshot encoded by to_bytes.
+        :return: StateSnapshot object.
+        """
+        data = memoryview(data)
+        if len(data) < len(SNAPSHOT_MAGIC) + VERSION_SIZE + CRC_SIZE or \
+                zlib.crc32(data[:-CRC_SIZE]) != int.from_bytes(data[-CRC_SIZE:], "big"):
+            raise ValueError("The snapshot is truncated or corrupted.")
+        if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or data[len(SNAPSHOT_MAGIC)] != SNAPSHOT_VERSION:
+            raise ValueError("Unknown snapshot format.")
+        offset = len(SNAPSHOT_MAGIC) + VERSION_SIZE
+
+        def read(size: int) -> memoryview:
+            nonlocal offset
+            if offset + size > len(data) - CRC_SIZE:
+                raise ValueError("The snapshot is truncated or corrupted.")
+            offset += size
+            return data[offset - size:offset]
+
+        snapshot = StateSnapshot()
+        snapshot.height = int.from_bytes(read(HEIGHT_SIZE), "big")
+        snapshot.tip_hash = read(BLOCK_ID_SIZE).hex()
+        snapshot.faucet_coins = int.from_bytes(read(FAUCET_SIZE), "big")
+        for _ in range(int.from_bytes(read(COUNT_SIZE), "big")):
+            account_id = read(ACCOUNT_ID_SIZE).hex()
+            snapshot.coin_database[account_id] = int.from_bytes(read(BALANCE_SIZE), "big", signed=True)
+        snapshot.tx_ids = {read(TX_ID_SIZE).hex() for _ in range(int.from_bytes(read(COUNT_SIZE), "big"))}
+        snapshot.key_images = {bytes(read(KEY_IMAGE_SIZE)) for _ in range(int.from_bytes(read(COUNT_SIZE), "big"))}
+        if offset != len(data) - CRC_SIZE:
+            raise ValueError("Wrong length of the snapshot.")
+        return snapshot
+
+
+def list_snapshots(directory: str) -> List[int]:
+    """
+    :return: heights of the snapshots in the directory, the latest first.
+    """
+    if not os.path.isdir(directory):
+        return []
+    heights = []
+    for name in os.listdir(directory):
+        match = SNAPSHOT_FILE_PATTERN.fullmatch(name)
+        if match:
+            heights.append(int(match.group(1)))
+    return sorted(heights, reverse=True)
+
+
+def save_snapshot(directory: str, snapshot: StateSnapshot) -> str:
+    """
+    Writes the snapshot atomically and removes the old ones beyond SNAPSHOTS_KEPT.
+    :return: path of the snapshot file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, SNAPSHOT_FILE % snapshot.height)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(snapshot.to_bytes())
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    for height in list_snapshots(directory)[SNAPSHOTS_KEPT:]:
+        os.remove(os.path.join(directory, SNAPSHOT_FILE % height))
+    return path
+
+
+def load_snapshot(directory: str, max_height: Optional[int] = None) -> Optional[StateSnapshot]:
+    """
+    :param max_height: snapshots of a longer history than this are skipped.
+    :return: the latest valid snapshot in the directory, None if there is none.
+    """
+    for height in list_snapshots(directory):
+        if max_height is not None and height > max_height:
+            continue
+        try:
+            with open(os.path.join(directory, SNAPSHOT_FILE % height), "rb") as file:
+                snapshot = StateSnapshot.from_bytes(file.read())
+        except (OSError, ValueError):
+            continue
+        if snapshot.height == height:
+            return snapshot
+    return None
+
+
+def append_key_image(directory: str, key_image: bytes) -> None:
+    """
+    Appends the encoded key image to the log and syncs it.
+    :return: None
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, KEY_IMAGE_LOG_FILE), "ab") as file:
+        file.write(key_image)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def load_key_images(directory: str) -> Set[bytes]:
+    """
+    :return: the key images of the log, a partially written last one is skipped.
+    """
+    path = os.path.join(directory, KEY_IMAGE_LOG_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as file:
+        data = file.read()
+    return {data[i:i + KEY_IMAGE_SIZE] for i in range(0, len(data) - KEY_IMAGE_SIZE + 1, KEY_IMAGE_SIZE)}
+
+
+def clear_key_images(directory: str) -> None:
+    """
+    Empties the log, once its images are held by a snapshot.
+    :return: None
+    """
+    path = os.path.join(directory, KEY_IMAGE_LOG_FILE)
+    if os.path.exists(path):
+        with open(path, "r+b") as file:
+            file.truncate(0)
+            os.fsync(file.fileno())
@@ -11,13 +11,20 @@
 """
 from copy import deepcopy
 from dataclasses import dataclass, field
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Dict
 
-from blockchain.account import Account
+from blockchain.account import Account, ACCOUNT_ID_SIZE, PUBLIC_KEY_SIZE
 from features.utils import get_transaction_message as tx_msg
+from signature_algorithms.curve import Point
 from signature_algorithms.ecdsa_signature import ECDSA
 from signature_algorithms.key_pair import KeyPair
 
+# Binary encoding of an operation (see Operation.to_bytes):
+# version | sender id | number of sender keys | sender public keys | receiver id | amount | signature (r, s).
+OPERATION_VERSION = 1
+AMOUNT_SIZE = 8
+SIGNATURE_SIZE = 64
+
 
 @dataclass
 class Operation:
@@ -59,12 +66,14 @@ class Operation:
         else:
             return None, False
 
-    def verify_operation(self) -> bool:
+    def verify_operation(self, signature_valid: Optional[bool] = None) -> bool:
         """
         The function which performs the verification of the operation. The main checks (relevant for proposed
         implementation) are: checking the transfer amount (that it does not exceed the sender's balance) and
         checking the signature (using the sender's public key).
 
+        :param signature_valid: result of the signature check if it was already done for many operations at once
+        (see signature_items and ECDSA.verify_batch).
         :return: true/false depending on the results of the transaction validation.
         """
         if self.signature is None or \
@@ -73,6 +82,9 @@ class Operation:
                 self.sender.get_balance < self.amount:
             return False
 
+        if signature_valid is not None:
+            return signature_valid
+
         for pair in self.sender.wallet:
             if ECDSA().verify(pair.public_key, tx_msg(self.sender.account_id,
                                                       self.receiver.account_id,
@@ -81,6 +93,77 @@ class Operation:
 
         return False
 
+    def signature_items(self) -> List[Tuple[Point, str, Tuple[int, int]]]:
+        """
+        The signature checks of this operation in the form accepted by ECDSA.verify_batch: one item per key in
+        the sender's wallet, the signature is valid if any of them is.
+        :return: list of (public key, message, signature).
+        """
+        if self.signature is None or self.sender is None or self.receiver is None:
+            return []
+        message = tx_msg(self.sender.account_id, self.receiver.account_id, self.amount)
+        return [(pair.public_key, message, self.signature) for pair in self.sender.wallet]
+
+    def to_bytes(self) -> bytes:
+        """
+        Canonical encoding: the accounts are referred to by id, the sender also by the public keys of its wallet
+        (needed to check the signature), nothing else of them is encoded.
+        :return: encoded operation.
+        """
+        return bytes([OPERATION_VERSION]) + \
+            self.sender.id_bytes() + self.sender.public_keys_bytes() + \
+            self.receiver.id_bytes() + \
+            self.amount.to_bytes(AMOUNT_SIZE, "big") + \
+            ECDSA().signature_to_bytes(self.signature)
+
+    @staticmethod
+    def from_bytes(data: bytes, accounts: Optional[Dict[str, Account]] = None) -> "Operation":
+        """
+        Decode an operation encoded by to_bytes.
+        :param accounts: known accounts by id, they are used instead of the public views of the encoded accounts
+        (see Account.from_public_keys), e.g. to check the balance of the sender.
+        :return: Operation object.
+        """
+        op, offset = Operation.read_from(memoryview(data), 0, accounts)
+        if offset != len(data):
+            raise ValueError("Wrong length of the encoded operation.")
+        return op
+
+    @staticmethod
+    def read_from(data: memoryview, offset: int,
+                  accounts: Optional[Dict[str, Account]] = None) -> Tuple["Operation", int]:
+        """
+        Decode the operation starting at the offset.
+        :return: the operation and the offset of the data after it.
+        """
+        try:
+            if data[offset] != OPERATION_VERSION:
+                raise ValueError(f"Unknown operation encoding version: {data[offset]}.")
+            offset += 1
+            sender_id = data[offset:offset + ACCOUNT_ID_SIZE].hex()
+            offset += ACCOUNT_ID_SIZE
+            keys_count = data[offset]
+            offset += 1
+            public_keys = [Point.from_bytes(data[offset + i * PUBLIC_KEY_SIZE:offset + (i + 1) * PUBLIC_KEY_SIZE])
+                           for i in range(keys_count)]
+            offset += keys_count * PUBLIC_KEY_SIZE
+            receiver_id = data[offset:offset + ACCOUNT_ID_SIZE].hex()
+            offset += ACCOUNT_ID_SIZE
+            amount = int.from_bytes(data[offset:offset + AMOUNT_SIZE], "big")
+            offset += AMOUNT_SIZE
+            signature = ECDSA().signature_from_bytes(data[offset:offset + SIGNATURE_SIZE])
+            offset += SIGNATURE_SIZE
+        except IndexError:
+            # A shorter signature is reported by signature_from_bytes.
+            raise ValueError("The encoded operation is truncated.")
+
+        accounts = accounts if accounts is not None else {}
+        sender = accounts.get(sender_id) or Account.from_public_keys(sender_id, public_keys)
+        receiver = accounts.get(receiver_id) or Account.from_public_keys(receiver_id, [])
+        op = Operation()
+        op.__initialize_fields(sender, receiver, amount, signature)
+        return op, offset
+
     def create_coinbase_op(self, receiver: Account, amount: int) -> Optional["Operation"]:
         sig, correct_sig = receiver.sign_data(receiver.wallet[0].private_key,
                                               tx_msg(receiver.account_id, receiver.account_id, amount))
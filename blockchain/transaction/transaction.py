@@ -5,18 +5,31 @@
 транзакции (хеш-значение от всех данных транзакции).
 """
 from copy import deepcopy
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, FrozenInstanceError
 from time import time
-from typing import Optional, List
-
-from hash_lib.SHA1 import SHA1
+from typing import Optional, List, Dict, Tuple
 
 from blockchain.account import Account
+from blockchain.hash import Hash
 from blockchain.transaction.operation import Operation
 
+# Binary encoding of a transaction (see Transaction.to_bytes):
+# version | sequence | timestamp | number of operations | operations (Operation.to_bytes).
+TRANSACTION_VERSION = 1
+SEQUENCE_SIZE = 2
+TIMESTAMP_SIZE = 8
+OPERATIONS_COUNT_SIZE = 2
+
 
-@dataclass
+@dataclass(eq=False)
 class Transaction:
+    """
+    The transactions returned by crete_transaction and crete_coinbase_transaction are frozen: the id is computed
+    once, it is the identity of the transaction (__eq__ and __hash__), and the fields can't be reassigned.
+    update_time is the only way to change a created transaction, it gives it a new id.
+    The id is the SHA-1 of the binary encoding without the sequence, so a transaction sent again with a greater
+    sequence keeps its id and replaces the previous one (see Block.add_transaction).
+    """
     # unique transaction ID (hash value from all other transaction fields).
     transaction_id: Optional[str] = field(default=None, repr=False)
 
@@ -30,11 +43,94 @@ class Transaction:
     # Timestamp
     __timestamp: Optional[int] = field(default=int(time()))
 
+    # Set on the created transactions, see the class description.
+    __frozen: bool = field(default=False, init=False, repr=False)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_Transaction__frozen", False):
+            raise FrozenInstanceError(f"cannot assign to field '{name}' of a created transaction")
+        super().__setattr__(name, value)
+
+    def __eq__(self, other):
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return self.transaction_id == other.transaction_id
+
+    def __hash__(self):
+        return hash(self.transaction_id)
+
+    def __body_bytes(self) -> bytes:
+        return self.__timestamp.to_bytes(TIMESTAMP_SIZE, "big") + \
+            len(self.set_of_operations).to_bytes(OPERATIONS_COUNT_SIZE, "big") + \
+            b"".join(op.to_bytes() for op in self.set_of_operations)
+
+    def compute_id(self) -> str:
+        """
+        :return: hex SHA-1 of the encoding without the sequence.
+        """
+        return Hash.to_sha1(bytes([TRANSACTION_VERSION]) + self.__body_bytes())
+
+    def to_bytes(self) -> bytes:
+        """
+        Canonical encoding of the transaction, the accounts of the operations are referred to by id and public keys.
+        :return: encoded transaction.
+        """
+        return bytes([TRANSACTION_VERSION]) + self.sequence.to_bytes(SEQUENCE_SIZE, "big", signed=True) + \
+            self.__body_bytes()
+
+    @staticmethod
+    def from_bytes(data: bytes, accounts: Optional[Dict[str, Account]] = None) -> "Transaction":
+        """
+        Decode a transaction encoded by to_bytes, the result is frozen like a created transaction.
+        :param accounts: known accounts by id, see Operation.from_bytes.
+        :return: Transaction object.
+        """
+        tx, offset = Transaction.read_from(memoryview(data), 0, accounts)
+        if offset != len(data):
+            raise ValueError("Wrong length of the encoded transaction.")
+        return tx
+
+    @staticmethod
+    def read_from(data: memoryview, offset: int,
+                  accounts: Optional[Dict[str, Account]] = None) -> Tuple["Transaction", int]:
+        """
+        Decode the transaction starting at the offset.
+        :return: the transaction and the offset of the data after it.
+        """
+        header_size = 1 + SEQUENCE_SIZE + TIMESTAMP_SIZE + OPERATIONS_COUNT_SIZE
+        if len(data) < offset + header_size:
+            raise ValueError("The encoded transaction is truncated.")
+        if data[offset] != TRANSACTION_VERSION:
+            raise ValueError(f"Unknown transaction encoding version: {data[offset]}.")
+        offset += 1
+        sequence = int.from_bytes(data[offset:offset + SEQUENCE_SIZE], "big", signed=True)
+        offset += SEQUENCE_SIZE
+        timestamp = int.from_bytes(data[offset:offset + TIMESTAMP_SIZE], "big")
+        offset += TIMESTAMP_SIZE
+        operations_count = int.from_bytes(data[offset:offset + OPERATIONS_COUNT_SIZE], "big")
+        offset += OPERATIONS_COUNT_SIZE
+
+        operations = []
+        for _ in range(operations_count):
+            op, offset = Operation.read_from(data, offset, accounts)
+            operations.append(op)
+
+        tx = Transaction(None, operations, sequence, timestamp)
+        tx.transaction_id = tx.compute_id()
+        object.__setattr__(tx, "_Transaction__frozen", True)
+        return tx, offset
+
+    def __frozen_copy(self) -> "Transaction":
+        tx = deepcopy(self)
+        object.__setattr__(tx, "_Transaction__frozen", True)
+        return tx
+
     # @performance
     def __initialize_fields(self, operations: List[Operation], sequence: int):
         self.set_of_operations = operations
         self.sequence = sequence
-        self.transaction_id = SHA1().update(self.__repr__().encode())
+        # A transaction with a missing (failed) operation can't be encoded, it is left without an id and is invalid.
+        self.transaction_id = self.compute_id() if None not in operations else None
 
     def crete_transaction(self, operations: List[Operation], sequence: int) -> Optional["Transaction"]:
         """
@@ -44,7 +140,7 @@ class Transaction:
         """
         self.__initialize_fields(operations, sequence)
         if self.verify_transaction():
-            return deepcopy(self)
+            return self.__frozen_copy()
         return None
 
     def crete_coinbase_transaction(self, miner: Account, amount: int) -> Optional["Transaction"]:
@@ -56,28 +152,39 @@ class Transaction:
         op = Operation().create_coinbase_op(miner, amount)
         self.__initialize_fields([op], -1)
         if self.verify_transaction(True):
-            return deepcopy(self)
+            return self.__frozen_copy()
         return None
 
-    def verify_transaction(self, coinbase: bool = False) -> bool:
+    def verify_transaction(self, coinbase: bool = False, signatures: Optional[List[bool]] = None) -> bool:
+        """
+        :param signatures: results of the signature checks of the operations (in the same order) if they were
+        already done for the whole block, see Block.verify_block.
+        :return: true if the transaction and all its operations are valid.
+        """
+        # The id of a frozen transaction was computed from the same fields, it isn't hashed again.
         if (self.sequence < 0 and not coinbase) or \
                 self.sequence > 255 or \
                 self.transaction_id is None or \
-                self.transaction_id != SHA1().update(self.__repr__().encode()):
+                (not self.__frozen and self.transaction_id != self.compute_id()):
             return False
 
-        for op in self.set_of_operations:
-            if op is None or (not op.verify_operation() and not coinbase):
+        for i, op in enumerate(self.set_of_operations):
+            signature_valid = None if signatures is None else signatures[i]
+            if op is None or (not op.verify_operation(signature_valid) and not coinbase):
                 return False
 
         return True
 
     def update_time(self):
-        self.__timestamp = int(time())
-        self.transaction_id = SHA1().update(self.__repr__().encode())
-
-    def __hash__(self):
-        return int(SHA1().update(self.__repr__().encode()), 16)
+        """
+        Re-identifies the transaction with the current time, e.g. to send it again in a new block.
+        The timestamp has a resolution of one second, so it is moved at least one second forward: the new id
+        always differs from the old one, even for two calls within the same second.
+        Don't call it on a transaction kept in a set or as a dict key, its hash changes.
+        :return: None
+        """
+        object.__setattr__(self, "_Transaction__timestamp", max(int(time()), self.__timestamp + 1))
+        object.__setattr__(self, "transaction_id", self.compute_id())
 
     def to_text_tx(self):
         return f"{'Transaction id:':15} {self.transaction_id}\n" + \
@@ -0,0 +1,55 @@
+from random import randint
+from time import time
+from unittest import mock
+
+from signature_algorithms.curve import MontgomeryCurve, Point
+
+"""
+Benchmark of the curve arithmetic.
+Run it with: python console_benchmark_curve.py
+"""
+
+
+def validating_point(x, y, curve):
+    # The behaviour before Point._unchecked: every result of the arithmetic is checked against the curve equation.
+    return Point(x, y, curve)
+
+
+def validating_check(curve, *points):
+    # The behaviour before MontgomeryCurve._check_points: the arguments are checked against the curve equation.
+    for p in points:
+        if not curve.is_on_curve(p):
+            raise ValueError("The points are not on the curve.")
+
+
+def benchmark(label: str, func, repeats: int) -> float:
+    t1 = time()
+    for _ in range(repeats):
+        func()
+    spent = (time() - t1) / repeats
+    print(f"{label:45} {spent * 1000:.3f} ms")
+    return spent
+
+
+def affine_chain(curve: MontgomeryCurve, point: Point, steps: int) -> Point:
+    res = point
+    for _ in range(steps):
+        res = curve.add_point(res, point)
+    return res
+
+
+if __name__ == '__main__':
+    curve = MontgomeryCurve()
+    # Not the generator, so the generic mul_point path is measured instead of the fixed-base table.
+    point = curve.mul_point(randint(1, curve.n - 1), curve.G)
+    scalar = randint(1, curve.n - 1)
+
+    with mock.patch.object(Point, "_unchecked", validating_point), \
+            mock.patch.object(MontgomeryCurve, "_check_points", validating_check):
+        mul_before = benchmark("mul_point, validated results:", lambda: curve.mul_point(scalar, point), 200)
+        add_before = benchmark("255 add_point, validated results:", lambda: affine_chain(curve, point, 255), 20)
+    mul_after = benchmark("mul_point, trusted results:", lambda: curve.mul_point(scalar, point), 200)
+    add_after = benchmark("255 add_point, trusted results:", lambda: affine_chain(curve, point, 255), 20)
+
+    print(f"{'mul_point speedup:':45} {mul_before / mul_after:.2f}x")
+    print(f"{'add_point speedup:':45} {add_before / add_after:.2f}x")
@@ -0,0 +1,42 @@
+import os
+from time import time
+
+from blockchain.block import NONCE_SIZE
+from blockchain.hash import Hash
+from blockchain.sha1_batch import SHA1NonceKernel, BATCH_SIZE
+
+"""
+Benchmark of the mining engines: hashes per second of the scalar loop and of the NumPy batch kernel.
+Run it with: python console_benchmark_mining.py
+"""
+
+ATTEMPTS = 1 << 19
+
+
+def scalar_loop(header_prefix: bytes) -> None:
+    # The loop of find_nonce with the scalar engine, target 1 is never reached.
+    midstate = Hash.new_sha1(header_prefix)
+    for nonce in range(1, ATTEMPTS + 1):
+        if int(midstate.copy().update(nonce.to_bytes(NONCE_SIZE, "big")).hexdigest(), 16) < 1:
+            return
+
+
+def numpy_kernel(header_prefix: bytes) -> None:
+    kernel = SHA1NonceKernel(header_prefix)
+    for start in range(1, ATTEMPTS + 1, BATCH_SIZE):
+        kernel.search_range(start, 1, BATCH_SIZE, 1)
+
+
+def hash_rate(label: str, func, header_prefix: bytes) -> float:
+    t1 = time()
+    func(header_prefix)
+    rate = ATTEMPTS / (time() - t1)
+    print(f"{label:30} {rate / 1000:.0f} kH/s")
+    return rate
+
+
+if __name__ == '__main__':
+    header_prefix = os.urandom(96)
+    scalar = hash_rate("scalar loop:", scalar_loop, header_prefix)
+    vectorized = hash_rate("numpy kernel:", numpy_kernel, header_prefix)
+    print(f"{'speedup:':30} {vectorized / scalar:.2f}x")
@@ -0,0 +1,58 @@
+import tracemalloc
+from time import time
+
+from signature_algorithms.curve import MontgomeryCurve
+from signature_algorithms.key_pair import KeyPairGenerator
+from signature_algorithms.ring_signature import RingSignature
+
+"""
+Benchmark of the peak memory of ring signatures: the list-based sign/verify against the streaming ones.
+Run it with: python console_benchmark_ring.py
+"""
+
+
+class GeneratedRing:
+    # Ring members produced on demand from the private keys 1..size, like keys read back from storage.
+    def __init__(self, size: int, curve: MontgomeryCurve):
+        self.size = size
+        self.curve = curve
+
+    def __iter__(self):
+        return (KeyPairGenerator.get_public_key(d, self.curve) for d in range(1, self.size + 1))
+
+
+def measure(func):
+    tracemalloc.start()
+    t1 = time()
+    result = func()
+    spent = time() - t1
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, spent
+
+
+if __name__ == '__main__':
+    curve = MontgomeryCurve()
+    sign = RingSignature(curve=curve)
+    message = "Ring signature benchmark"
+    # Build the table of G before measuring, it is shared by all the runs.
+    curve.get_base_table()
+
+    print(f"{'ring size':>10} {'sign, KiB':>12} {'verify, KiB':>12} {'sign_stream, KiB':>17} "
+          f"{'verify_stream, KiB':>19} {'packed, bytes':>14}")
+    for size in (16, 64, 128):
+        ring = GeneratedRing(size, curve)
+        signer = size // 2
+
+        # The list-based functions need every member in memory.
+        signature, sign_peak, _ = measure(lambda: sign.sign(message, list(ring), signer + 1, signer))
+        valid, verify_peak, _ = measure(lambda: sign.verify(message, list(ring), *signature))
+        assert valid
+
+        # sign_stream keeps only the packed output, which is 32 bytes per member.
+        packed, stream_sign_peak, _ = measure(lambda: sign.sign_stream(message, ring, signer + 1, signer))
+        valid, stream_verify_peak, _ = measure(lambda: sign.verify_stream(message, iter(ring), packed))
+        assert valid
+
+        print(f"{size:>10} {sign_peak / 1024:>12.1f} {verify_peak / 1024:>12.1f} {stream_sign_peak / 1024:>17.1f} "
+              f"{stream_verify_peak / 1024:>19.1f} {len(packed):>14}")
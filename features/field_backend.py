@@ -0,0 +1,74 @@
+"""
+Big-integer backend of the field arithmetic (features/utils.py and the curve math).
+gmpy2 (https://gmpy2.readthedocs.io) is used when it is installed, otherwise plain Python ints.
+The backend is selected at import time and can be switched with set_backend, e.g. to compare the results.
+"""
+
+from typing import List
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+GMPY2 = "gmpy2"
+PYTHON = "python"
+
+_backend = GMPY2 if gmpy2 is not None else PYTHON
+
+
+def available_backends() -> List[str]:
+    """
+    :return: names of the backends which can be used in this environment.
+    """
+    return [GMPY2, PYTHON] if gmpy2 is not None else [PYTHON]
+
+
+def get_backend() -> str:
+    """
+    :return: name of the backend in use.
+    """
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """
+    Switch the backend, the name must be one of available_backends().
+    :return: None
+    """
+    global _backend
+    if name not in available_backends():
+        raise ValueError(f"Backend {name} is not available.")
+    _backend = name
+
+
+def to_field(value: int):
+    """
+    Convert an integer to the type used by the backend. The results of arithmetic with it keep that type,
+    so it is enough to convert the coordinates entering a computation.
+    :return: gmpy2.mpz or int.
+    """
+    if _backend == GMPY2:
+        return gmpy2.mpz(value)
+    return value
+
+
+def powmod(a: int, e: int, m: int) -> int:
+    """
+    :return: a^e mod m as a Python int.
+    """
+    if _backend == GMPY2:
+        return int(gmpy2.powmod(a, e, m))
+    return pow(a, e, m)
+
+
+def invert(a: int, m: int) -> int:
+    """
+    :return: a^-1 mod m as a Python int, ValueError is raised if it doesn't exist.
+    """
+    if _backend == GMPY2:
+        try:
+            return int(gmpy2.invert(a, m))
+        except ZeroDivisionError:
+            raise ValueError("base is not invertible for the given modulus")
+    return pow(a, -1, m)
@@ -7,6 +7,7 @@ All links are provided!
 from math import log
 
 from blockchain.hash import Hash
+from features import field_backend
 
 """
 Modular multiplicative inverse function in Python:
@@ -37,14 +38,37 @@ def mod_inv(a, m):
     an integer `a` is an integer x such that the product ax is congruent to 1 with respect to the modulus m.
     In the standard notation of modular arithmetic this congruence is written as
     ax ≡ 1 (mod m)
+    It is computed iteratively by the field backend (gmpy2 or the built-in three-argument pow),
+    unlike the recursive egcd above.
     :return: multiplicative inverse of an integer a
     """
-    a = a % m
-    g, x, y = egcd(a, m)
-    if g != 1:
+    try:
+        return field_backend.invert(a, m)
+    except ValueError:
         raise Exception("modular inverse does not exist")
-    else:
-        return x % m
+
+
+def batch_mod_inv(values, m):
+    """
+    Montgomery's trick: invert all the values with a single modular inversion and 3(N - 1) multiplications.
+    The prefix products c_i = a_0 * ... * a_i are accumulated, c_(N-1) is inverted and the inverses of the
+    single values are peeled off going backwards: a_i^-1 = c_(i-1) * c_i^-1, c_(i-1)^-1 = a_i * c_i^-1.
+    https://en.wikipedia.org/wiki/Modular_multiplicative_inverse#Multiple_inverses
+    :return: list of multiplicative inverses in the same order as values
+    """
+    if not values:
+        return []
+    prefix = [values[0] % m]
+    for a in values[1:]:
+        prefix.append(prefix[-1] * a % m)
+
+    inv = mod_inv(prefix[-1], m)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        result[i] = prefix[i - 1] * inv % m
+        inv = inv * values[i] % m
+    result[0] = inv
+    return result
 
 
 """
@@ -64,6 +88,16 @@ def mod_sqrt(a, p):
     This algorithm runs in polynomial time (unless thegeneralized Riemann hypothesis is false).
     """
 
+    # p = 5 (mod 8), e.g. the Curve25519 prime: one exponentiation instead of the Legendre symbol and Tonelli-Shanks.
+    # x = a^((p + 3) / 8) satisfies x^2 = a or x^2 = -a, in the second case it is fixed with sqrt(-1) = 2^((p - 1) / 4).
+    # https://www.rfc-editor.org/rfc/rfc8032#section-5.1.3
+    if p % 8 == 5:
+        a %= p
+        x = field_backend.powmod(a, (p + 3) // 8, p)
+        if x * x % p != a:
+            x = x * field_backend.powmod(2, (p - 1) // 4, p) % p
+        return x if x * x % p == a else 0
+
     # Simple cases
     if legendre_symbol(a, p) != 1:
         return 0
@@ -72,7 +106,7 @@ def mod_sqrt(a, p):
     elif p == 2:
         return p
     elif p % 4 == 3:
-        return pow(a, (p + 1) // 4, p)
+        return field_backend.powmod(a, (p + 1) // 4, p)
 
     # Partition p-1 to s * 2^e for an odd s (i.e.
     # reduce all the powers of 2 from p-1)
@@ -105,9 +139,9 @@ def mod_sqrt(a, p):
     # both a and b
     # r is the exponent - decreases with each update
     #
-    x = pow(a, (s + 1) // 2, p)
-    b = pow(a, s, p)
-    g = pow(n, s, p)
+    x = field_backend.powmod(a, (s + 1) // 2, p)
+    b = field_backend.powmod(a, s, p)
+    g = field_backend.powmod(n, s, p)
     r = e
 
     while True:
@@ -116,25 +150,47 @@ def mod_sqrt(a, p):
         for m in range(r):
             if t == 1:
                 break
-            t = pow(t, 2, p)
+            t = field_backend.powmod(t, 2, p)
 
         if m == 0:
             return x
 
-        gs = pow(g, 2 ** (r - m - 1), p)
+        gs = field_backend.powmod(g, 2 ** (r - m - 1), p)
         g = (gs * gs) % p
         x = (x * gs) % p
         b = (b * g) % p
         r = m
 
 
+def wnaf(d, w):
+    """
+    Width-w non-adjacent form of a non-negative integer d: every digit is zero or odd in (-2^(w-1), 2^(w-1))
+    and there is at most one non-zero digit in any w consecutive ones, so d * P needs about bits / (w + 1)
+    additions of precomputed odd multiples of P.
+    https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#w-ary_non-adjacent_form_(wNAF)_method
+    :return: list of digits, the least significant first.
+    """
+    digits = []
+    while d:
+        if d & 1:
+            digit = d & ((1 << w) - 1)
+            if digit >= 1 << (w - 1):
+                digit -= 1 << w
+            d -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        d >>= 1
+    return digits
+
+
 def legendre_symbol(a, p):
     """
     Compute the Legendre symbol a|p using Euler's criterion. p is a prime,
     a is relatively prime to p (if p divides a, then a|p = 0)
     :return: 1 if a has a square root modulo p, -1 otherwise.
     """
-    ls = pow(a, (p - 1) // 2, p)
+    ls = field_backend.powmod(a, (p - 1) // 2, p)
     return -1 if ls == p - 1 else ls
 
 
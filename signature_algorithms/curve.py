@@ -1,6 +1,8 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
 from os import urandom
-from typing import Optional
+from typing import Optional, Tuple, List, Dict
+from features import field_backend
 from features.utils import *
 
 """
@@ -14,9 +16,19 @@ All links are provided!
 Code modification from: https://github.com/lc6chang/ecc-pycrypto/blob/master/ecc/curve.py
 """
 
+# Point at infinity in Jacobian coordinates (any triple with Z == 0).
+JACOBIAN_INF = (1, 1, 0)
+# Width of the wNAF used by multi_mul for points without a cached table.
+MULTI_MUL_WINDOW = 5
+# Number of decoded points kept by Point.from_bytes.
+POINT_DECODE_CACHE_SIZE = 4096
+
 
 @dataclass
 class Point:
+    # No per-instance __dict__: public keys are kept in memory in large numbers.
+    __slots__ = ("x", "y", "curve")
+
     x: Optional[int]
     y: Optional[int]
     curve: "MontgomeryCurve"
@@ -29,9 +41,47 @@ class Point:
         return self.x is None and self.y is None
 
     def __post_init__(self):
-        if not self.is_ideal_point() and not self.curve.is_on_curve(self):
+        if self.is_ideal_point():
+            return
+        # Only the canonical coordinates are accepted, x + p would be the same point with another encoding.
+        if not (0 <= self.x < self.curve.p and 0 <= self.y < self.curve.p):
+            raise ValueError("The coordinates of the point are not reduced modulo p.")
+        if not self.curve.is_on_curve(self):
             raise ValueError("The point is not on the curve.")
 
+    @classmethod
+    def _unchecked(cls, x: Optional[int], y: Optional[int], curve: "MontgomeryCurve") -> "Point":
+        """
+        Trusted constructor for the results of the curve arithmetic: they are on the curve by construction,
+        so the curve equation is not evaluated again. Points coming from outside (user input, deserialized keys)
+        must be created with Point(...), which validates them.
+        """
+        point = cls.__new__(cls)
+        point.x = x
+        point.y = y
+        point.curve = curve
+        return point
+
+    def to_bytes(self) -> bytes:
+        """
+        Compressed encoding: one prefix byte (2 + the lowest bit of y) and the big-endian x-coordinate,
+        33 bytes for Curve25519. The point at infinity is encoded as zero bytes.
+        :return: encoded point.
+        """
+        if self.is_ideal_point():
+            return bytes(self.curve.coordinate_size + 1)
+        return bytes([2 | (self.y & 1)]) + self.x.to_bytes(self.curve.coordinate_size, "big")
+
+    @staticmethod
+    def from_bytes(data: bytes, curve: Optional["MontgomeryCurve"] = None) -> "Point":
+        """
+        Decode a point encoded by to_bytes, y is recovered with MontgomeryCurve.compute_y.
+        The result is validated and cached, so the same object may be returned for the same bytes.
+        :param curve: curve of the point, Curve25519 by default.
+        :return: decoded point.
+        """
+        return _point_from_bytes(bytes(data), curve if curve is not None else get_curve())
+
     def __str__(self):
         if self.is_ideal_point():
             return f"Point(At infinity, Curve={str(self.curve)})"
@@ -42,7 +92,12 @@ class Point:
         return self.__str__()
 
     def __eq__(self, other):
-        return self.curve == other.curve and self.x == other.x and self.y == other.y
+        if not isinstance(other, Point):
+            return NotImplemented
+        return self.curve is other.curve and self.x == other.x and self.y == other.y
+
+    def __hash__(self):
+        return hash((self.x, self.y))
 
     def __neg__(self):
         return self.curve.neg_point(self)
@@ -64,7 +119,47 @@ class Point:
         return self.__mul__(scalar)
 
 
-@dataclass
+@lru_cache(maxsize=POINT_DECODE_CACHE_SIZE)
+def _point_from_bytes(data: bytes, curve: "MontgomeryCurve") -> Point:
+    size = curve.coordinate_size
+    if len(data) != size + 1:
+        raise ValueError("Wrong length of the encoded point.")
+    if data == bytes(size + 1):
+        return curve.INF
+    if data[0] not in (2, 3):
+        raise ValueError("Unknown point encoding.")
+
+    x = int.from_bytes(data[1:], "big")
+    if x >= curve.p:
+        raise ValueError("Non-canonical point encoding: x is not reduced modulo p.")
+    y = curve.compute_y(x)
+    if y == 0 and (x * x * x + curve.a * x * x + x) % curve.p != 0:
+        raise ValueError("The point is not on the curve.")
+    if y & 1 != data[0] & 1:
+        if y == 0:
+            raise ValueError("Non-canonical point encoding: y is 0, so the prefix must be 2.")
+        y = -y % curve.p
+    # The bytes come from outside, so the point is validated by the public constructor.
+    return Point(x, y, curve)
+
+
+# Registry of the created curves, the key is the tuple of curve parameters.
+CURVES: Dict[tuple, "MontgomeryCurve"] = {}
+
+
+def get_curve(name: str = "Curve25519") -> "MontgomeryCurve":
+    """
+    :return: the registered curve with the given name (Curve25519 is always available).
+    """
+    for curve in CURVES.values():
+        if curve.name == name:
+            return curve
+    if name == "Curve25519":
+        return MontgomeryCurve()
+    raise ValueError(f"Unknown curve: {name}")
+
+
+@dataclass(eq=False)
 class MontgomeryCurve:
     """
     by^2 = x^3 + ax^2 + x
@@ -72,6 +167,9 @@ class MontgomeryCurve:
 
     Constants are used to implement the curve25519.
     https://en.wikipedia.org/wiki/Curve25519
+
+    Curves are interned: creating a curve with the parameters of an existing one returns that same object,
+    so two curves are equal only if they are the same object (eq=False keeps the identity __eq__ and __hash__).
     """
 
     name: str = field(default="Curve25519")
@@ -82,6 +180,25 @@ class MontgomeryCurve:
     n: int = field(default=0x1000000000000000000000000000000014def9dea2f79cd65812631a5cf5d3ed)
     G_x: int = field(default=0x9)
     G_y: int = field(default=0x20ae19a1b8a086b4e01edd2c7748d14c923d4d7e6d7c61b229e9c5a27eced3d9)
+    # Cofactor: the number of points on the curve is h * n.
+    h: int = field(default=8)
+
+    # Precomputed multiples of G, built on the first multiplication of G (see signature_algorithms/fixed_base.py).
+    # It is not a dataclass field, so __init__ of an interned curve doesn't reset it.
+    base_table = None
+
+    def __new__(cls, *args, **kwargs):
+        params = {f.name: f.default for f in fields(cls)}
+        params.update(zip(params, args))
+        params.update(kwargs)
+        key = tuple(params.values())
+        if key not in CURVES:
+            CURVES[key] = super().__new__(cls)
+        return CURVES[key]
+
+    def __reduce__(self):
+        # Copies and unpickled curves resolve to the interned object.
+        return MontgomeryCurve, (self.name, self.a, self.b, self.p, self.n, self.G_x, self.G_y, self.h)
 
     def __str__(self):
         return self.name
@@ -89,21 +206,44 @@ class MontgomeryCurve:
     def __repr__(self):
         return self.__str__()
 
-    def __eq__(self, other):
-        return (
-                self.a == other.a and self.b == other.b and self.p == other.p and
-                self.n == other.n and self.G_x == other.G_x and self.G_y == other.G_y)
-
     @property
     def G(self) -> Point:
         return Point(self.G_x, self.G_y, self)
 
     @property
     def INF(self) -> Point:
-        return Point(None, None, self)
+        return Point._unchecked(None, None, self)
+
+    @property
+    def coordinate_size(self) -> int:
+        """
+        :return: number of bytes of an encoded coordinate.
+        """
+        return (self.p.bit_length() + 7) // 8
+
+    def get_base_table(self) -> "FixedBaseTable":
+        """
+        :return: the fixed-base table of G, it is built on the first call.
+        """
+        if self.base_table is None:
+            from signature_algorithms.fixed_base import FixedBaseTable
+            self.base_table = FixedBaseTable(self, self.G)
+        return self.base_table
+
+    def use_base_table_file(self, path: str, use_mmap: bool = False) -> None:
+        """
+        Load the fixed-base table of G from the file, the table is built and saved there if the file doesn't exist.
+        :return: None
+        """
+        from os.path import exists
+        from signature_algorithms.fixed_base import FixedBaseTable
+        if exists(path):
+            self.base_table = FixedBaseTable.load(path, self, use_mmap)
+        else:
+            self.get_base_table().save(path)
 
     def is_on_curve(self, p: Point) -> bool:
-        if p.curve != self:
+        if p.curve is not self:
             return False
         return p.is_ideal_point() or self._is_on_curve(p)
 
@@ -112,9 +252,17 @@ class MontgomeryCurve:
         right = (p.x * p.x * p.x) + (self.a * p.x * p.x) + p.x
         return (left - right) % self.p == 0
 
+    def _check_points(self, *points: Point) -> None:
+        """
+        Points are validated once, when they are created (see Point.__post_init__), so the arithmetic only checks
+        that its arguments belong to this curve instead of evaluating the curve equation on every call.
+        """
+        for p in points:
+            if p.curve is not self:
+                raise ValueError("The points are not on the curve.")
+
     def add_point(self, p: Point, q: Point) -> Point:
-        if (not self.is_on_curve(p)) or (not self.is_on_curve(q)):
-            raise ValueError("The points are not on the curve.")
+        self._check_points(p, q)
         if p.is_ideal_point():
             return q
         elif q.is_ideal_point():
@@ -136,7 +284,7 @@ class MontgomeryCurve:
         s = delta_y * mod_inv(delta_x, self.p)
         res_x = (self.b * s * s - self.a - p.x - q.x) % self.p
         res_y = (p.y + s * (res_x - p.x)) % self.p
-        return - Point(res_x, res_y, self)
+        return Point._unchecked(res_x, -res_y % self.p, self)
 
     def _double_point(self, p: Point) -> Point:
         # s = (3 * xP^2 + 2 * a * xP + 1) / (2 * b * yP)
@@ -147,43 +295,213 @@ class MontgomeryCurve:
         s = up * mod_inv(down, self.p)
         res_x = (self.b * s * s - self.a - 2 * p.x) % self.p
         res_y = (p.y + s * (res_x - p.x)) % self.p
-        return - Point(res_x, res_y, self)
+        return Point._unchecked(res_x, -res_y % self.p, self)
+
+    # Jacobian coordinates: (X, Y, Z) represents the affine point (X / Z^2, Y / Z^3), Z == 0 is the point at infinity.
+    # The formulas below are the affine ones above with the denominators kept in Z, so no inversion is needed
+    # until the result is converted back with _from_jacobian.
+    # The coordinates have the type of the field backend (see features/field_backend.py), the affine results are ints.
+    # https://en.wikibooks.org/wiki/Cryptography/Prime_Curve/Jacobian_Coordinates
+
+    def _to_jacobian(self, p: Point) -> Tuple[int, int, int]:
+        if p.is_ideal_point():
+            return JACOBIAN_INF
+        return field_backend.to_field(p.x), field_backend.to_field(p.y), field_backend.to_field(1)
+
+    def _from_jacobian(self, jp: Tuple[int, int, int]) -> Point:
+        x, y, z = jp
+        if z % self.p == 0:
+            return self.INF
+        z_inv = mod_inv(z, self.p)
+        z_inv_2 = z_inv * z_inv % self.p
+        return Point._unchecked(int(x * z_inv_2 % self.p), int(y * z_inv_2 * z_inv % self.p), self)
+
+    def _from_jacobian_many(self, jps: List[Tuple[int, int, int]]) -> List[Point]:
+        """
+        Convert many points back to affine coordinates sharing one modular inversion (see batch_mod_inv).
+        """
+        finite = [i for i, jp in enumerate(jps) if jp[2] % self.p != 0]
+        z_invs = batch_mod_inv([jps[i][2] for i in finite], self.p)
+        res = [self.INF] * len(jps)
+        for i, z_inv in zip(finite, z_invs):
+            x, y, _ = jps[i]
+            z_inv_2 = z_inv * z_inv % self.p
+            res[i] = Point._unchecked(int(x * z_inv_2 % self.p), int(y * z_inv_2 * z_inv % self.p), self)
+        return res
+
+    def _jacobian_double(self, jp: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        # M = 3 * X^2 + 2 * a * X * Z^2 + Z^4
+        # Z3 = 2 * b * Y * Z
+        # X3 = b * M^2 - a * Z3^2 - 8 * b^2 * X * Y^2
+        # Y3 = M * (4 * b^2 * X * Y^2 - X3) - 8 * b^3 * Y^4
+        x, y, z = jp
+        if z == 0 or y == 0:
+            return JACOBIAN_INF
+        zz = z * z % self.p
+        m = (3 * x * x + 2 * self.a * x * zz + zz * zz) % self.p
+        res_z = 2 * self.b * y * z % self.p
+        b_yy = self.b * y * y % self.p
+        t = 4 * self.b * x * b_yy % self.p
+        res_x = (self.b * m * m - self.a * res_z * res_z - 2 * t) % self.p
+        res_y = (m * (t - res_x) - 8 * self.b * b_yy * b_yy) % self.p
+        return res_x, res_y, res_z
+
+    def _jacobian_add(self, jp: Tuple[int, int, int], jq: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        # U1 = X1 * Z2^2, U2 = X2 * Z1^2, S1 = Y1 * Z2^3, S2 = Y2 * Z1^3
+        # H = U2 - U1, R = S2 - S1, Z3 = H * Z1 * Z2
+        # X3 = b * R^2 - a * Z3^2 - (U1 + U2) * H^2
+        # Y3 = R * (U1 * H^2 - X3) - S1 * H^3
+        x1, y1, z1 = jp
+        x2, y2, z2 = jq
+        if z1 == 0:
+            return jq
+        if z2 == 0:
+            return jp
+        z1z1 = z1 * z1 % self.p
+        z2z2 = z2 * z2 % self.p
+        u1 = x1 * z2z2 % self.p
+        u2 = x2 * z1z1 % self.p
+        s1 = y1 * z2z2 * z2 % self.p
+        s2 = y2 * z1z1 * z1 % self.p
+        return self._jacobian_add_parts(u1, u2, s1, s2, z1 * z2, jp)
+
+    def _jacobian_add_affine(self, jp: Tuple[int, int, int], x2: int, y2: int) -> Tuple[int, int, int]:
+        """
+        Mixed addition: the second point is affine (Z2 == 1), which saves a few multiplications.
+        """
+        x1, y1, z1 = jp
+        if z1 == 0:
+            return field_backend.to_field(x2), field_backend.to_field(y2), field_backend.to_field(1)
+        z1z1 = z1 * z1 % self.p
+        u2 = x2 * z1z1 % self.p
+        s2 = y2 * z1z1 * z1 % self.p
+        return self._jacobian_add_parts(x1, u2, y1, s2, z1, jp)
+
+    def _jacobian_add_parts(self, u1: int, u2: int, s1: int, s2: int, z1z2: int,
+                            jp: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        h = (u2 - u1) % self.p
+        r = (s2 - s1) % self.p
+        if h == 0:
+            if r == 0:
+                return self._jacobian_double(jp)
+            return JACOBIAN_INF
+        hh = h * h % self.p
+        res_z = h * z1z2 % self.p
+        res_x = (self.b * r * r - self.a * res_z * res_z - (u1 + u2) * hh) % self.p
+        res_y = (r * (u1 * hh - res_x) - s1 * hh * h) % self.p
+        return res_x, res_y, res_z
 
     def mul_point(self, d: int, p: Point) -> Point:
         """
         https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication
+        Left-to-right double-and-add in Jacobian coordinates, only the result is converted back to affine.
         """
-        if not self.is_on_curve(p):
-            raise ValueError("The point is not on the curve.")
+        self._check_points(p)
         if p.is_ideal_point():
             return self.INF
         if d == 0:
             return self.INF
+        if p.x == self.G_x and p.y == self.G_y:
+            return self.get_base_table().mul(d)
 
-        res = self.INF
         is_negative_scalar = d < 0
         d = -d if is_negative_scalar else d
-        tmp = p
-        while d:
-            if d & 0x1 == 1:
-                res = self.add_point(res, tmp)
-            tmp = self.add_point(tmp, tmp)
-            d >>= 1
+        res = JACOBIAN_INF
+        for bit in bin(d)[2:]:
+            res = self._jacobian_double(res)
+            if bit == "1":
+                res = self._jacobian_add_affine(res, p.x, p.y)
+        res = self._from_jacobian(res)
         if is_negative_scalar:
             return -res
         else:
             return res
 
+    def _odd_multiples(self, points: List[Point], window: int) -> List[List[Point]]:
+        """
+        wNAF tables [P, 3P, 5P, ..., (2^(window - 1) - 1)P] of the points, converted to affine with one shared inversion.
+        """
+        count = 1 << (window - 2)
+        jacobian = []
+        for p in points:
+            jp = self._to_jacobian(p)
+            double = self._jacobian_double(jp)
+            row = [jp]
+            for _ in range(count - 1):
+                row.append(self._jacobian_add(row[-1], double))
+            jacobian.extend(row)
+        affine = self._from_jacobian_many(jacobian)
+        return [affine[i:i + count] for i in range(0, len(affine), count)]
+
+    def multi_mul(self, pairs: List[Tuple[int, Point]], cache: Optional["PublicKeyTableCache"] = None) -> Point:
+        """
+        Compute k1 * P1 + k2 * P2 + ... for a list of (k, P) pairs at once.
+        Straus' algorithm (Shamir's trick) is used: every scalar is recoded to wNAF, every point gets a table of its
+        odd multiples and all of them share one chain of doublings, instead of one chain per multiplication.
+        Multiples of G are summed into one scalar and taken from the fixed-base table.
+        https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#Shamir's_trick
+        :param cache: optional cache of the tables of frequently used points (see signature_algorithms/key_cache.py).
+        :return: sum of the products.
+        """
+        return self._from_jacobian(self._multi_mul_jacobian(pairs, cache))
+
+    def _multi_mul_jacobian(self, pairs: List[Tuple[int, Point]],
+                            cache: Optional["PublicKeyTableCache"] = None) -> Tuple[int, int, int]:
+        """
+        The same as multi_mul, but the result is left in Jacobian coordinates, so the results of many calls
+        can be converted to affine together (see _from_jacobian_many).
+        """
+        g_scalar = 0
+        tables: List[Optional[List[Point]]] = []
+        digits = []
+        missing = []
+        # Sum of the products computed without the shared doubling chain.
+        fixed_res = JACOBIAN_INF
+        for d, p in pairs:
+            self._check_points(p)
+            if p.is_ideal_point() or d == 0:
+                continue
+            if p.x == self.G_x and p.y == self.G_y:
+                g_scalar += d
+                continue
+            if cache is not None:
+                table = cache.get_table(p)
+                if not isinstance(table, list):
+                    # A hot key promoted to a fixed-base table.
+                    fixed_res = self._jacobian_add(fixed_res, table.mul_jacobian(d))
+                    continue
+                tables.append(table)
+                window = cache.window
+            else:
+                tables.append(None)
+                missing.append(p)
+                window = MULTI_MUL_WINDOW
+            digits.append([-digit for digit in wnaf(-d, window)] if d < 0 else wnaf(d, window))
+
+        built = iter(self._odd_multiples(missing, MULTI_MUL_WINDOW))
+        tables = [next(built) if table is None else table for table in tables]
+
+        res = JACOBIAN_INF
+        for i in range(max(map(len, digits), default=0) - 1, -1, -1):
+            res = self._jacobian_double(res)
+            for point_digits, table in zip(digits, tables):
+                if i < len(point_digits) and point_digits[i]:
+                    digit = point_digits[i]
+                    entry = table[abs(digit) >> 1]
+                    res = self._jacobian_add_affine(res, entry.x, entry.y if digit > 0 else -entry.y % self.p)
+        if g_scalar % self.n:
+            fixed_res = self._jacobian_add(fixed_res, self.get_base_table().mul_jacobian(g_scalar))
+        return self._jacobian_add(res, fixed_res)
+
     def neg_point(self, p: Point) -> Point:
-        if not self.is_on_curve(p):
-            raise ValueError("The point is not on the curve.")
+        self._check_points(p)
         if p.is_ideal_point():
             return self.INF
 
         return self._neg_point(p)
 
     def _neg_point(self, p: Point) -> Point:
-        return Point(p.x, -p.y % self.p, self)
+        return Point._unchecked(p.x, -p.y % self.p, self)
 
     def compute_y(self, x: int) -> int:
         right = (x * x * x + self.a * x * x + x) % self.p
@@ -1,15 +1,18 @@
 from dataclasses import dataclass, field
 from random import randint
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List
 from blockchain.hash import Hash
-from features.utils import mod_inv
+from features.utils import mod_inv, batch_mod_inv
 from signature_algorithms.curve import Point, MontgomeryCurve
+from signature_algorithms.key_cache import PublicKeyTableCache, DEFAULT_KEY_CACHE
 
 
 @dataclass
 class ECDSA:
     gen_point: Optional[Point] = field(default=None)
     curve: MontgomeryCurve = field(default=MontgomeryCurve())
+    # Tables of the public keys of frequent signers, None disables caching.
+    key_cache: Optional[PublicKeyTableCache] = field(default=DEFAULT_KEY_CACHE)
 
     def __post_init__(self):
         self.gen_point = self.curve.G
@@ -38,10 +41,29 @@ class ECDSA:
         # 7. A's signature for the message m is (r, s).
         return r, s
 
+    def signature_to_bytes(self, signature: Tuple[int, int]) -> bytes:
+        """
+        Fixed-width encoding of a signature: big-endian r and s, 64 bytes for Curve25519.
+        :return: encoded signature.
+        """
+        size = (self.curve.n.bit_length() + 7) // 8
+        r, s = signature
+        return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+
+    def signature_from_bytes(self, data: bytes) -> Tuple[int, int]:
+        """
+        Decode a signature encoded by signature_to_bytes.
+        :return: (r, s).
+        """
+        size = (self.curve.n.bit_length() + 7) // 8
+        if len(data) != 2 * size:
+            raise ValueError("Wrong length of the encoded signature.")
+        return int.from_bytes(data[:size], "big"), int.from_bytes(data[size:], "big")
+
     # @performance
     def verify(self, _public_key: Point, message: str, r: int, s: int) -> bool:
         # 1. Verify that r and s are integers in the interval [1, n - 1].
-        if r not in range(1, self.curve.n - 1) or r not in range(1, self.curve.n - 1):
+        if r not in range(1, self.curve.n) or s not in range(1, self.curve.n):
             return False
 
         # 2. Compute SHA-1(m) and convert this bit string to an integer e
@@ -55,13 +77,49 @@ class ECDSA:
         u2 = (r * w) % self.curve.n
 
         # 5. Compute X = u1G + u2Q.
-        point_x = self.curve.add_point(self.curve.mul_point(u1, self.gen_point), self.curve.mul_point(u2, _public_key))
+        point_x = self.curve.multi_mul([(u1, self.gen_point), (u2, _public_key)], self.key_cache)
 
         # 6. If X = 0, then reject the signature.
         # Otherwise, convert the x-coordinate x1 of X to an integer x1, and compute v = x1 mod n.
-        if not self.curve.is_on_curve(point_x):
+        if point_x.is_ideal_point():
             return False
         v = point_x.x % self.curve.n
 
         # 7. Accept the signature if and only if u = r.
         return v == r
+
+    def verify_batch(self, items: List[Tuple[Point, str, Tuple[int, int]]]) -> List[bool]:
+        """
+        Verify many signatures in one pass. Every signature is checked as in verify, but the work is shared:
+        each distinct message is hashed once, all s^-1 mod n are computed with one inversion, and all
+        u1G + u2Q points are converted to affine with one more inversion.
+        :param items: list of (public key, message, (r, s)).
+        :return: list of results in the same order as items.
+        """
+        results = [False] * len(items)
+        # 1. Verify that r and s are integers in the interval [1, n - 1].
+        checked = [i for i, (_, _, (r, s)) in enumerate(items)
+                   if r in range(1, self.curve.n) and s in range(1, self.curve.n)]
+
+        # 2. Compute SHA-1(m) once per distinct message.
+        hashes = {}
+        for i in checked:
+            message = items[i][1]
+            if message not in hashes:
+                hashes[message] = int(Hash().to_sha1(message), 16)
+
+        # 3. Compute all w = s^-1 mod n at once.
+        ws = batch_mod_inv([items[i][2][1] for i in checked], self.curve.n)
+
+        # 4-5. Compute X = u1G + u2Q, u1 = ew mod n and u2 = rw mod n.
+        points_x = []
+        for i, w in zip(checked, ws):
+            public_key, message, (r, _) = items[i]
+            u1 = (hashes[message] * w) % self.curve.n
+            u2 = (r * w) % self.curve.n
+            points_x.append(self.curve._multi_mul_jacobian([(u1, self.gen_point), (u2, public_key)], self.key_cache))
+
+        # 6-7. Reject X = 0, otherwise accept if x1 mod n == r.
+        for i, point_x in zip(checked, self.curve._from_jacobian_many(points_x)):
+            results[i] = not point_x.is_ideal_point() and point_x.x % self.curve.n == items[i][2][0]
+        return results
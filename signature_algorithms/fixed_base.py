@@ -0,0 +1,160 @@
+import mmap
+import os
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Union
+
+from signature_algorithms.curve import MontgomeryCurve, Point, JACOBIAN_INF
+
+"""
+Fixed-base multiplication with a precomputed window table:
+https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication#Fixed-base_windowing
+The table for the generator point can be saved to a file and loaded (or memory-mapped) on the next start.
+"""
+
+TABLE_MAGIC = b"BBFB"
+TABLE_VERSION = 1
+# Magic, version, window and the length of the curve name: the shortest possible header.
+MIN_HEADER_SIZE = len(TABLE_MAGIC) + 3
+
+
+@dataclass
+class FixedBaseTable:
+    """
+    Precomputed multiples of a fixed point P: entry (i, j) holds j * 2^(window * i) * P for j in [1, 2^window).
+    k * P is then the sum of one table entry per window of k, so no point doublings are needed at all.
+    """
+    curve: MontgomeryCurve
+    base: Point
+    window: int = field(default=4)
+    # Affine (x, y) entries, window after window, or the raw bytes of a loaded table file.
+    entries: Optional[Union[List[Tuple[int, int]], bytes, mmap.mmap]] = field(default=None, repr=False)
+
+    windows_count: int = field(default=0, init=False, repr=False)
+    row_size: int = field(default=0, init=False, repr=False)
+    # Where the coordinates start when the entries are the raw bytes of a table file.
+    data_offset: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        self.windows_count = (self.curve.n.bit_length() + self.window - 1) // self.window
+        self.row_size = (1 << self.window) - 1
+        self.data_offset = len(self.header())
+        if self.entries is None:
+            points = self.curve._from_jacobian_many(self.__jacobian_entries())
+            self.entries = [(point.x, point.y) for point in points]
+
+    @staticmethod
+    def build_many(curve: MontgomeryCurve, points: List[Point], window: int = 4) -> List["FixedBaseTable"]:
+        """
+        Build the tables of many points, all their entries are converted to affine with one shared inversion.
+        :return: list of FixedBaseTable objects in the same order as points.
+        """
+        tables = [FixedBaseTable(curve, point, window, []) for point in points]
+        jacobian_entries = []
+        for table in tables:
+            jacobian_entries.extend(table.__jacobian_entries())
+        affine = curve._from_jacobian_many(jacobian_entries)
+        size = len(affine) // len(tables) if tables else 0
+        for i, table in enumerate(tables):
+            table.entries = [(point.x, point.y) for point in affine[i * size:(i + 1) * size]]
+        return tables
+
+    def __jacobian_entries(self) -> List[Tuple[int, int, int]]:
+        jacobian_entries = []
+        row_base = self.curve._to_jacobian(self.base)
+        for _ in range(self.windows_count):
+            acc = row_base
+            for _ in range(self.row_size):
+                jacobian_entries.append(acc)
+                acc = self.curve._jacobian_add(acc, row_base)
+            # After the loop acc == 2^window * row_base, the base of the next row.
+            row_base = acc
+        return jacobian_entries
+
+    def get_entry(self, index: int) -> Tuple[int, int]:
+        if isinstance(self.entries, list):
+            return self.entries[index]
+        size = self.curve.coordinate_size
+        offset = self.data_offset + index * 2 * size
+        x = int.from_bytes(self.entries[offset:offset + size], "big")
+        y = int.from_bytes(self.entries[offset + size:offset + 2 * size], "big")
+        return x, y
+
+    def mul(self, d: int) -> Point:
+        """
+        Multiply the base point by d using one mixed addition per non-zero window of d.
+        :return: d * base.
+        """
+        return self.curve._from_jacobian(self.mul_jacobian(d))
+
+    def mul_jacobian(self, d: int) -> Tuple[int, int, int]:
+        """
+        The same as mul, but the result is left in Jacobian coordinates to be used in further arithmetic.
+        """
+        if d < 0 or d >> (self.window * self.windows_count):
+            # Out of the range covered by the table: only correct for a base point of order n (G, public keys).
+            d %= self.curve.n
+        res = JACOBIAN_INF
+        mask = self.row_size
+        index = 0
+        while d:
+            digit = d & mask
+            if digit:
+                x, y = self.get_entry(index + digit - 1)
+                res = self.curve._jacobian_add_affine(res, x, y)
+            d >>= self.window
+            index += self.row_size
+        return res
+
+    def header(self) -> bytes:
+        name = self.curve.name.encode()
+        return TABLE_MAGIC + bytes([TABLE_VERSION, self.window, len(name)]) + name
+
+    def save(self, path: str) -> None:
+        """
+        Write the table to a file: a short header followed by big-endian x and y coordinates of the curve's
+        coordinate size.
+        :return: None
+        """
+        size = self.curve.coordinate_size
+        with open(path, "wb") as file:
+            file.write(self.header())
+            for index in range(self.windows_count * self.row_size):
+                x, y = self.get_entry(index)
+                file.write(x.to_bytes(size, "big") + y.to_bytes(size, "big"))
+
+    @staticmethod
+    def load(path: str, curve: MontgomeryCurve, use_mmap: bool = False) -> "FixedBaseTable":
+        """
+        Read a table of the curve generator point written by save.
+        The file is a trust boundary: the header, the first entry and every point are checked against the curve.
+        :param use_mmap: keep the file memory-mapped and decode entries on access instead of reading it all.
+        :return: FixedBaseTable object.
+        """
+        with open(path, "rb") as file:
+            # Checked before mapping: an empty file can't be memory-mapped.
+            if os.fstat(file.fileno()).st_size < MIN_HEADER_SIZE:
+                raise ValueError("The table file is truncated.")
+            if use_mmap:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = file.read()
+
+        if data[:len(TABLE_MAGIC)] != TABLE_MAGIC or data[len(TABLE_MAGIC)] != TABLE_VERSION:
+            raise ValueError("Unknown table format.")
+        window = data[len(TABLE_MAGIC) + 1]
+        if window == 0:
+            raise ValueError("Wrong window of the table.")
+        table = FixedBaseTable(curve, curve.G, window, data)
+        if data[:table.data_offset] != table.header():
+            raise ValueError("The table was built for another curve.")
+        entries_count = table.windows_count * table.row_size
+        if len(data) != table.data_offset + entries_count * 2 * curve.coordinate_size:
+            raise ValueError("The table file is truncated.")
+        if table.get_entry(0) != (curve.G_x, curve.G_y):
+            raise ValueError("The table was not built for the generator point.")
+        for index in range(entries_count):
+            Point(*table.get_entry(index), curve)
+
+        if not use_mmap:
+            table.entries = [table.get_entry(index) for index in range(entries_count)]
+        return table
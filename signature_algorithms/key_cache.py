@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Union
+
+from signature_algorithms.curve import Point
+from signature_algorithms.fixed_base import FixedBaseTable
+
+"""
+A small set of accounts (beneficiaries, miners, the faucet) signs most of the operations,
+so the precomputed tables of their public keys are kept between verifications.
+"""
+
+
+@dataclass(eq=False)
+class PublicKeyTableCache:
+    """
+    Bounded LRU cache of precomputed tables of public keys, used by MontgomeryCurve.multi_mul.
+    A key gets a wNAF table (its odd multiples) on the first use. Once it has been hit promote_after times it is
+    considered hot and the table is replaced by a fixed-base window table, which needs no doublings at all
+    (about 120 KB per key). When the cache is full the least recently used key is evicted.
+    """
+    max_size: int = field(default=64)
+    # Wider than the window of the tables built per call: a cached table is paid for once and reused.
+    window: int = field(default=6)
+    promote_after: int = field(default=4)
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    evictions: int = field(default=0, init=False)
+    promotions: int = field(default=0, init=False)
+    # point -> [number of hits, table]
+    tables: "OrderedDict[Point, list]" = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def get_table(self, point: Point) -> Union[List[Point], FixedBaseTable]:
+        """
+        :return: the table of the point, it is built and stored on a miss.
+        """
+        entry = self.tables.get(point)
+        if entry is not None:
+            self.hits += 1
+            self.tables.move_to_end(point)
+            entry[0] += 1
+            if entry[0] == self.promote_after and self.__in_prime_subgroup(point):
+                # The fixed-base table reduces scalars modulo n, which is only correct for points of order n.
+                entry[1] = FixedBaseTable(point.curve, point)
+                self.promotions += 1
+            return entry[1]
+
+        self.misses += 1
+        table = point.curve._odd_multiples([point], self.window)[0]
+        self.tables[point] = [0, table]
+        if len(self.tables) > self.max_size:
+            self.tables.popitem(last=False)
+            self.evictions += 1
+        return table
+
+    @staticmethod
+    def __in_prime_subgroup(point: Point) -> bool:
+        return point.curve.multi_mul([(point.curve.n, point)]).is_ideal_point()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        :return: hits, misses, evictions, promotions and the current number of tables.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "promotions": self.promotions, "size": len(self.tables)}
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.hits, self.misses, self.evictions, self.promotions = 0, 0, 0, 0
+
+
+# Shared by every ECDSA object unless another cache (or None to disable caching) is passed.
+DEFAULT_KEY_CACHE = PublicKeyTableCache()
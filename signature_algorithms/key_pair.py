@@ -95,4 +95,12 @@ class KeyPair:
     public_key: Optional[Point] = field(default=None)
 
     def __post_init__(self):
-        self.private_key, self.public_key = KeyPairGenerator().gen_keypair()
+        # A key pair created from a public key only (e.g. decoded from a block) has no private key.
+        if self.public_key is None:
+            self.private_key, self.public_key = KeyPairGenerator().gen_keypair()
+
+    def public_key_bytes(self) -> bytes:
+        """
+        :return: compressed encoding of the public key (see Point.to_bytes).
+        """
+        return self.public_key.to_bytes()
@@ -0,0 +1,126 @@
+from functools import lru_cache
+from random import randint
+from typing import Tuple, Union
+
+from dataclasses import dataclass
+
+from blockchain.hash import Hash
+from signature_algorithms.curve import Point
+from signature_algorithms.ring_signature import RingSignature, PreparedRing
+
+"""
+Linkable ring signature (LSAG): https://eprint.iacr.org/2004/027.pdf
+Besides the ring signature itself the signer publishes the key image I = x * Hp(P), where x is the private key,
+P = x * G the public key and Hp a hash onto the curve. The key image doesn't tell which member signed, but it is
+the same for every signature made with the same key, so a second signature is detected by looking the image up
+(see blockchain/key_image.py) instead of comparing it with the whole history.
+"""
+
+# Number of hashed points kept by hash_to_point, the public keys of the rings in use.
+HASH_TO_POINT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=HASH_TO_POINT_CACHE_SIZE)
+def hash_to_point(p: Point) -> Point:
+    """
+    Hp: try-and-increment, the hash of the encoded point and a counter is taken as the x-coordinate until it
+    belongs to the curve. The result is multiplied by the cofactor, so it lies in the subgroup of order n.
+    :return: point of the curve whose discrete logarithm nobody knows.
+    """
+    curve = p.curve
+    counter = 0
+    while True:
+        x = int(Hash.to_keccak(p.to_bytes() + counter.to_bytes(4, "big")), 16) % curve.p
+        y = curve.compute_y(x)
+        if y:
+            point = curve.mul_point(curve.h, Point(x, y, curve))
+            if not point.is_ideal_point():
+                return point
+        counter += 1
+
+
+@dataclass
+class LinkableRingSignature(RingSignature):
+    """
+    Ring signature with a key image, see the module description.
+    The signature is (e_0, ss, key_image).
+    """
+
+    def key_image(self, private_key: int, public_key: Point) -> Point:
+        """
+        :return: I = x * Hp(P).
+        """
+        return self.curve.mul_point(private_key, hash_to_point(public_key))
+
+    def _challenge(self, msg: str, l_point: Point, r_point: Point) -> int:
+        """
+        :return: H(m, L, R) -> int.
+        """
+        str2hash = "%s,%s,%s" % (msg, l_point.to_bytes().hex(), r_point.to_bytes().hex())
+        return int(Hash.to_keccak(str2hash), 16)
+
+    def _image_commitment(self, s_i: int, e_i: int, public_key: Point, key_image: Point) -> Point:
+        """
+        :return: s_i * Hp(P_i) + e_i * I.
+        """
+        return self.curve.multi_mul([(s_i, hash_to_point(public_key)), (e_i, key_image)])
+
+    def sign(self, msg: str, public_keys: Union[list, PreparedRing], private_key: int,
+             signer_key_index: int) -> Tuple[int, list, Point]:
+        """
+        :param msg: plain text.
+        :param public_keys: array of public keys or a prepared ring.
+        :param private_key: private key.
+        :param signer_key_index: index of public key in array.
+        :return: signature (e_0, ss, key_image).
+        """
+        keys_count = len(public_keys)
+        key_image = self.key_image(private_key, public_keys[signer_key_index])
+        ss: list = [0] * keys_count
+
+        alfa = randint(1, self.curve.n - 1)
+        e = self._challenge(msg, self.curve.mul_point(alfa, self.gen_point),
+                            self.curve.mul_point(alfa, hash_to_point(public_keys[signer_key_index])))
+
+        e_0 = e if signer_key_index == keys_count - 1 else None
+        for i in list(range(signer_key_index + 1, keys_count)) + list(range(signer_key_index)):
+            ss[i] = randint(1, self.curve.n - 1)
+            e = self._challenge(msg, self._commitment(ss[i], e, public_keys, i),
+                                self._image_commitment(ss[i], e, public_keys[i], key_image))
+            if i == keys_count - 1:
+                e_0 = e
+
+        ss[signer_key_index] = (alfa - private_key * e) % self.curve.n
+        return e_0, ss, key_image
+
+    def verify(self, msg: str, public_keys: Union[list, PreparedRing], e_0: int, ss: list,
+               key_image: Point) -> bool:
+        """
+        :param msg: Plain text.
+        :param public_keys: Array of public keys or a prepared ring.
+        :return: true if signature is valid.
+        """
+        keys_count = len(public_keys)
+        if keys_count == 0 or len(ss) != keys_count:
+            return False
+        # The image must have canonical coordinates (x + p would be the same point with another encoding) and lie
+        # in the subgroup of order n (otherwise adding a small-order point to it would give another valid image of
+        # the same key), so every key has exactly one accepted image.
+        if key_image.curve is not self.curve or key_image.is_ideal_point() or \
+                not (0 <= key_image.x < self.curve.p and 0 <= key_image.y < self.curve.p) or \
+                not self.curve.is_on_curve(key_image) or \
+                not self.curve.mul_point(self.curve.n, key_image).is_ideal_point():
+            return False
+
+        e = e_0
+        for i in range(keys_count):
+            e = self._challenge(msg, self._commitment(ss[i], e, public_keys, i),
+                                self._image_commitment(ss[i], e, public_keys[i], key_image))
+        return e == e_0
+
+    @staticmethod
+    def is_linked(signature: Tuple[int, list, Point], other: Tuple[int, list, Point]) -> bool:
+        """
+        :return: true if both signatures were made with the same private key.
+        """
+        return signature[2] == other[2]
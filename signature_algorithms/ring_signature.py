@@ -1,13 +1,41 @@
 import itertools
 from random import randint
-from typing import Optional
+from typing import Optional, List, Tuple, Union, Iterable
 
 from dataclasses import dataclass, field
 
-# Use my own implementation of Keccak
-from hash_lib.Keccak.Keccak import Keccak
-
+from blockchain.hash import Hash
 from signature_algorithms.curve import Point, MontgomeryCurve
+from signature_algorithms.fixed_base import FixedBaseTable
+
+# Packed signature: the number of ring members, then e_0 and every s_i as fixed-width big-endian integers.
+RING_SIZE_BYTES = 4
+SCALAR_SIZE = 32
+
+
+@dataclass
+class PreparedRing:
+    """
+    A ring of public keys prepared for repeated signing and verification: every member gets a fixed-base table
+    (see signature_algorithms/fixed_base.py), so e_i * P_i needs no doublings. The tables of all members are
+    built at once with one shared inversion. It can be passed to RingSignature instead of the list of keys.
+    The tables reduce the scalars modulo n, which is only correct for points of order n: a member outside the
+    prime-order subgroup gets no table (None) and is multiplied with multi_mul, like in a plain list.
+    """
+    public_keys: List[Point]
+    tables: Optional[List[Optional[FixedBaseTable]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        curve = self.public_keys[0].curve if self.public_keys else MontgomeryCurve()
+        in_subgroup = [curve.multi_mul([(curve.n, p)]).is_ideal_point() for p in self.public_keys]
+        tables = iter(FixedBaseTable.build_many(curve, [p for p, ok in zip(self.public_keys, in_subgroup) if ok]))
+        self.tables = [next(tables) if ok else None for ok in in_subgroup]
+
+    def __len__(self):
+        return len(self.public_keys)
+
+    def __getitem__(self, i: int) -> Point:
+        return self.public_keys[i]
 
 
 @dataclass
@@ -31,7 +59,47 @@ class RingSignature:
         """
         str2hash = "%s,%d,%d" % (lc_msg, lc_point.x, lc_point.y)
 
-        return int(Keccak().update(str2hash.encode()), 16)
+        return int(Hash.to_keccak(str2hash), 16)
+
+    @staticmethod
+    def prepare_ring(public_keys: list) -> PreparedRing:
+        """
+        :param public_keys: array of public keys.
+        :return: the ring with precomputed tables of its members, to be reused across signatures.
+        """
+        return PreparedRing(list(public_keys))
+
+    def _commitment(self, s_i: int, e_i: int, public_keys: Union[list, PreparedRing], i: int) -> Point:
+        """
+        :return: s_i * G + e_i * P_i.
+        """
+        if isinstance(public_keys, PreparedRing) and public_keys.tables[i] is not None:
+            return self.curve._from_jacobian(self.curve._jacobian_add(self.curve.get_base_table().mul_jacobian(s_i),
+                                                                      public_keys.tables[i].mul_jacobian(e_i)))
+        return self.curve.multi_mul([(s_i, self.gen_point), (e_i, public_keys[i])])
+
+    @staticmethod
+    def pack_signature(e_0: int, ss: list) -> bytes:
+        """
+        Compact encoding of a signature: 4 bytes of the ring size, then e_0 and every s_i in 32 bytes each.
+        :return: packed signature.
+        """
+        return len(ss).to_bytes(RING_SIZE_BYTES, "big") + e_0.to_bytes(SCALAR_SIZE, "big") + \
+            b"".join(s.to_bytes(SCALAR_SIZE, "big") for s in ss)
+
+    @staticmethod
+    def unpack_signature(data: bytes) -> Tuple[int, list]:
+        """
+        Decode a signature packed by pack_signature or sign_stream.
+        :return: (e_0, ss) as accepted by verify.
+        """
+        data = memoryview(data)
+        keys_count = int.from_bytes(data[:RING_SIZE_BYTES], "big")
+        if len(data) != RING_SIZE_BYTES + (keys_count + 1) * SCALAR_SIZE:
+            raise ValueError("Wrong length of the packed signature.")
+        values = [int.from_bytes(data[offset:offset + SCALAR_SIZE], "big")
+                  for offset in range(RING_SIZE_BYTES, len(data), SCALAR_SIZE)]
+        return values[0], values[1:]
 
     # @performance
     def sign(self, msg: str, public_keys: list, private_key: int, signer_key_index: int):
@@ -39,7 +107,7 @@ class RingSignature:
         Function that accepts message, arrays of public and private keys and private key index of signer
         and generate
         :param msg: plain text.
-        :param public_keys: array of public keys.
+        :param public_keys: array of public keys or a prepared ring.
         :param private_key: private key.
         :param signer_key_index: index of public key in array.
         :return: signature.
@@ -63,8 +131,7 @@ class RingSignature:
                 next_i = (i + 1) % keys_count
 
                 # Two new EC points are created by multiplying ss_i by G and e_i
-                z_s[i] = self.curve.add_point(self.curve.mul_point(ss[i], self.gen_point),
-                                              self.curve.mul_point(e[i], public_keys[i]))
+                z_s[i] = self._commitment(ss[i], e[i], public_keys, i)
                 e[next_i] = self.convert_to_hash_string(msg, z_s[i])
 
         # The signer part itself is calculated separately. This is where the private key is used
@@ -77,7 +144,7 @@ class RingSignature:
         Check signature: specifies that the 's' values are calculated after the 'e' values,
         so it involves the use of a private key
         :param msg: Plain text.
-        :param public_keys: Array of public keys.
+        :param public_keys: Array of public keys or a prepared ring.
         :param e_0: first part of signature.
         :param ss: second part of signature.
         :return: true if signature is valid.
@@ -89,10 +156,83 @@ class RingSignature:
 
         # Iterate over the array and calculate the z_s_i values used to determine the e's, similar to the signature
         for i in range(keys_count):
-            z_s[i] = self.curve.add_point(self.curve.mul_point(ss[i], self.gen_point),
-                                          self.curve.mul_point(e[i], public_keys[i]))
+            z_s[i] = self._commitment(ss[i], e[i], public_keys, i)
             if i < keys_count - 1:
                 e[i + 1] = self.convert_to_hash_string(msg, z_s[i])
 
         to_check = self.convert_to_hash_string(msg, z_s[keys_count - 1])
         return e[0] == to_check
+
+    def verify_many(self, msg_sig_pairs: List[Tuple[str, Tuple[int, list]]], ring: Union[list, PreparedRing]) -> List[bool]:
+        """
+        Verify many signatures made with the same ring, the ring is prepared once and reused for all of them.
+        :param msg_sig_pairs: list of (message, (e_0, ss)).
+        :param ring: array of public keys or a prepared ring.
+        :return: list of results in the same order.
+        """
+        if not isinstance(ring, PreparedRing):
+            ring = self.prepare_ring(ring)
+        return [self.verify(msg, ring, *signature) for msg, signature in msg_sig_pairs]
+
+    def sign_stream(self, msg: str, public_keys: Iterable[Point], private_key: int, signer_key_index: int) -> bytes:
+        """
+        Memory-bounded version of sign for very large rings: only the current public key and the current e are
+        kept, the s values are written straight into the packed signature (see pack_signature).
+        The ring is read twice (the members after the signer, then the members before it), so public_keys must be
+        re-iterable, e.g. a list or an object producing the keys from storage, not a one-shot iterator.
+        :return: packed signature.
+        """
+        if iter(public_keys) is public_keys:
+            raise ValueError("The public keys must be re-iterable, they are read twice.")
+
+        alfa = randint(0, self.curve.n)
+        e = self.convert_to_hash_string(msg, self.curve.mul_point(alfa, self.gen_point))
+
+        # The members after the signer: e_(n) computed at the end of the pass is e_0.
+        tail = bytearray()
+        keys_count = 0
+        for i, public_key in enumerate(public_keys):
+            keys_count = i + 1
+            if i > signer_key_index:
+                s_i = randint(0, self.curve.n)
+                tail += s_i.to_bytes(SCALAR_SIZE, "big")
+                e = self.convert_to_hash_string(msg, self._commitment(s_i, e, [public_key], 0))
+        if signer_key_index >= keys_count:
+            raise ValueError("The signer index is out of the ring.")
+        e_0 = e
+
+        # The members before the signer, the loop ends with e = e_pi.
+        head = bytearray()
+        for i, public_key in enumerate(public_keys):
+            if i == signer_key_index:
+                break
+            s_i = randint(0, self.curve.n)
+            head += s_i.to_bytes(SCALAR_SIZE, "big")
+            e = self.convert_to_hash_string(msg, self._commitment(s_i, e, [public_key], 0))
+
+        s_pi = (alfa - private_key * e) % self.curve.n
+        return keys_count.to_bytes(RING_SIZE_BYTES, "big") + e_0.to_bytes(SCALAR_SIZE, "big") + \
+            bytes(head) + s_pi.to_bytes(SCALAR_SIZE, "big") + bytes(tail)
+
+    def verify_stream(self, msg: str, public_keys: Iterable[Point], signature: bytes) -> bool:
+        """
+        Memory-bounded version of verify: the public keys are consumed one by one (any iterator will do) and the
+        s values are read from the packed signature in place, so the state doesn't grow with the ring size.
+        :return: true if signature is valid.
+        """
+        data = memoryview(signature)
+        keys_count = int.from_bytes(data[:RING_SIZE_BYTES], "big")
+        if keys_count == 0 or len(data) != RING_SIZE_BYTES + (keys_count + 1) * SCALAR_SIZE:
+            return False
+
+        e_0 = int.from_bytes(data[RING_SIZE_BYTES:RING_SIZE_BYTES + SCALAR_SIZE], "big")
+        e = e_0
+        consumed = 0
+        for i, public_key in enumerate(public_keys):
+            if i == keys_count:
+                return False
+            offset = RING_SIZE_BYTES + (i + 1) * SCALAR_SIZE
+            s_i = int.from_bytes(data[offset:offset + SCALAR_SIZE], "big")
+            e = self.convert_to_hash_string(msg, self._commitment(s_i, e, [public_key], 0))
+            consumed = i + 1
+        return consumed == keys_count and e == e_0
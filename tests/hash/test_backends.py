@@ -0,0 +1,51 @@
+import os
+import unittest
+
+from blockchain import hash as hash_backends
+from blockchain.hash import Hash, SHA1_ALGORITHM, KECCAK_ALGORITHM
+from tests.hash import test_keccak, test_sha1
+
+
+class HashBackendsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.selected = {algorithm: hash_backends.get_backend(algorithm)
+                         for algorithm in (SHA1_ALGORITHM, KECCAK_ALGORITHM)}
+
+    def tearDown(self) -> None:
+        for algorithm, name in self.selected.items():
+            hash_backends.set_backend(algorithm, name)
+
+    def run_vectors(self, algorithm: str, test_case: type):
+        # The vectors of the existing test case must pass with every backend.
+        for name in hash_backends.available_backends(algorithm):
+            with self.subTest(backend=name):
+                hash_backends.set_backend(algorithm, name)
+                result = unittest.TestResult()
+                unittest.defaultTestLoader.loadTestsFromTestCase(test_case).run(result)
+                self.assertTrue(result.wasSuccessful(), result.failures + result.errors)
+
+    def test_sha1_vectors(self):
+        self.assertIn(hash_backends.HASHLIB, hash_backends.available_backends(SHA1_ALGORITHM))
+        self.run_vectors(SHA1_ALGORITHM, test_sha1.SHA1TestCase)
+
+    def test_keccak_vectors(self):
+        self.run_vectors(KECCAK_ALGORITHM, test_keccak.KeccakTestCase)
+
+    def test_backends_agree(self):
+        # Lengths around the block sizes (64 bytes for SHA-1, 136 bytes for Keccak-256).
+        messages = [os.urandom(length) for length in (0, 1, 55, 56, 63, 64, 65, 135, 136, 137, 300)]
+        for algorithm, func in ((SHA1_ALGORITHM, Hash.to_sha1), (KECCAK_ALGORITHM, Hash.to_keccak)):
+            for message in messages:
+                digests = set()
+                for name in hash_backends.available_backends(algorithm):
+                    hash_backends.set_backend(algorithm, name)
+                    digests.add(func(message))
+                self.assertEqual(len(digests), 1, (algorithm, message.hex()))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            hash_backends.set_backend(SHA1_ALGORITHM, "unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from blockchain import hash as hash_backends
+from blockchain.hash import Hash, SHA1_ALGORITHM, KECCAK_ALGORITHM, HASHLIB, PYSHA3
+
+
+class HasherTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.selected = {algorithm: hash_backends.get_backend(algorithm)
+                         for algorithm in (SHA1_ALGORITHM, KECCAK_ALGORITHM)}
+
+    def tearDown(self) -> None:
+        for algorithm, name in self.selected.items():
+            hash_backends.set_backend(algorithm, name)
+
+    def check_incremental(self, algorithm: str, new, one_shot):
+        for name in hash_backends.available_backends(algorithm):
+            with self.subTest(backend=name):
+                hash_backends.set_backend(algorithm, name)
+                prefix = b"prev_hash,timestamp," * 5
+                hasher = new(prefix)
+                self.assertEqual(hasher.backend, name)
+                # Only these backends keep a real midstate, the others buffer the data.
+                self.assertEqual(hasher.incremental, name in (HASHLIB, PYSHA3))
+                self.assertEqual(hasher.copy().incremental, hasher.incremental)
+                self.assertEqual(hasher.hexdigest(), one_shot(prefix))
+
+                # Forks of the same midstate don't affect each other.
+                forks = [hasher.copy().update(str(nonce).encode()) for nonce in range(3)]
+                for nonce, fork in enumerate(forks):
+                    self.assertEqual(fork.hexdigest(), one_shot(prefix + str(nonce).encode()))
+                    self.assertEqual(fork.digest(), bytes.fromhex(fork.hexdigest()))
+                self.assertEqual(hasher.hexdigest(), one_shot(prefix))
+
+                # Data fed in parts.
+                message = bytes(range(256)) * 2
+                parts = new()
+                for i in range(0, len(message), 7):
+                    parts.update(message[i:i + 7])
+                self.assertEqual(parts.hexdigest(), one_shot(message))
+
+    def test_sha1(self):
+        self.check_incremental(SHA1_ALGORITHM, Hash.new_sha1, Hash.to_sha1)
+
+    def test_keccak(self):
+        self.check_incremental(KECCAK_ALGORITHM, Hash.new_keccak, Hash.to_keccak)
+
+
+if __name__ == '__main__':
+    unittest.main()
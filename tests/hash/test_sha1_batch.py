@@ -0,0 +1,38 @@
+import os
+import unittest
+
+import numpy as np
+
+from blockchain.blockchain import find_nonce, SCALAR_ENGINE, NUMPY_ENGINE
+from blockchain.hash import Hash
+from blockchain.sha1_batch import SHA1NonceKernel, digest_to_hex
+
+
+class SHA1BatchTestCase(unittest.TestCase):
+    def test_matches_hash_to_sha1(self):
+        nonces = np.array([0, 1, 255, 256, 2 ** 32 - 1, 2 ** 32, 2 ** 64 - 1], dtype=np.uint64)
+        # Prefix lengths around the block boundaries, 96 is the length of the block header prefix.
+        for length in (0, 1, 47, 48, 55, 56, 63, 64, 96, 130):
+            prefix = os.urandom(length)
+            digests = SHA1NonceKernel(prefix).digests(nonces)
+            for nonce, digest in zip(nonces, digests):
+                self.assertEqual(digest_to_hex(digest), Hash.to_sha1(prefix + int(nonce).to_bytes(8, "big")))
+
+    def test_search(self):
+        prefix = os.urandom(96)
+        kernel = SHA1NonceKernel(prefix)
+        # One nonce in 256 is below the target, a miss in 4096 nonces has probability ~1e-7.
+        target = 1 << 152
+        found = kernel.search_range(1, 1, 4096, target)
+        self.assertIsNotNone(found)
+        self.assertLess(int(Hash.to_sha1(prefix + found.to_bytes(8, "big")), 16), target)
+        # The scalar loop finds the same (first) nonce.
+        self.assertEqual(find_nonce(prefix, target, 1, 1, engine=SCALAR_ENGINE), found)
+        self.assertEqual(find_nonce(prefix, target, 1, 1, engine=NUMPY_ENGINE), found)
+
+        self.assertIsNone(kernel.search_range(1, 3, 100, 1))
+        self.assertEqual(kernel.search_range(5, 2, 10, 1 << 160), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import pickle
+import unittest
+from copy import deepcopy
+from random import randint
+
+from signature_algorithms.curve import MontgomeryCurve, Point, get_curve
+
+
+class MontgomeryCurveTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.curve = MontgomeryCurve()
+
+    def affine_mul(self, d, p):
+        res = self.curve.INF
+        while d:
+            if d & 0x1 == 1:
+                res = self.curve.add_point(res, p)
+            p = self.curve.add_point(p, p)
+            d >>= 1
+        return res
+
+    def test_mul_point_matches_affine_arithmetic(self):
+        for _ in range(5):
+            d = randint(1, self.curve.n - 1)
+            self.assertEqual(self.curve.mul_point(d, self.curve.G), self.affine_mul(d, self.curve.G))
+
+        point = self.curve.mul_point(12345, self.curve.G)
+        self.assertEqual(self.curve.mul_point(678, point), self.affine_mul(678, point))
+
+    def test_mul_point_edge_cases(self):
+        self.assertTrue(self.curve.mul_point(0, self.curve.G).is_ideal_point())
+        self.assertTrue(self.curve.mul_point(self.curve.n, self.curve.G).is_ideal_point())
+        self.assertEqual(self.curve.mul_point(-7, self.curve.G), -self.affine_mul(7, self.curve.G))
+        self.assertEqual(self.curve.mul_point(self.curve.n + 1, self.curve.G), self.curve.G)
+
+    def test_multi_mul(self):
+        points = [self.curve.mul_point(randint(1, self.curve.n - 1), self.curve.G) for _ in range(3)]
+        scalars = [randint(1, self.curve.n - 1) for _ in range(3)]
+        pairs = list(zip(scalars, points)) + [(-17, points[0]), (randint(1, self.curve.n - 1), self.curve.G)]
+
+        expected = self.curve.INF
+        for d, p in pairs:
+            expected = expected + self.curve.mul_point(d, p)
+        self.assertEqual(self.curve.multi_mul(pairs), expected)
+
+        self.assertTrue(self.curve.multi_mul([]).is_ideal_point())
+        self.assertTrue(self.curve.multi_mul([(5, points[1]), (-5, points[1])]).is_ideal_point())
+        self.assertEqual(self.curve.multi_mul([(3, self.curve.G), (0, points[2])]), self.curve.mul_point(3, self.curve.G))
+
+    def test_points_are_validated_on_creation(self):
+        with self.assertRaises(ValueError):
+            Point(self.curve.G_x, self.curve.G_y + 1, self.curve)
+        # Unreduced coordinates of a valid point.
+        with self.assertRaises(ValueError):
+            Point(self.curve.G_x + self.curve.p, self.curve.G_y, self.curve)
+        with self.assertRaises(ValueError):
+            Point(self.curve.G_x, self.curve.G_y - self.curve.p, self.curve)
+        other_curve = MontgomeryCurve(name="Other", a=7)
+        with self.assertRaises(ValueError):
+            self.curve.add_point(self.curve.G, Point(None, None, other_curve))
+
+    def test_curves_are_interned(self):
+        self.assertIs(MontgomeryCurve(), self.curve)
+        self.assertIs(get_curve("Curve25519"), self.curve)
+        self.assertIs(deepcopy(self.curve), self.curve)
+        self.assertIs(pickle.loads(pickle.dumps(self.curve)), self.curve)
+        self.assertIsNot(MontgomeryCurve(name="Other", a=7), self.curve)
+        with self.assertRaises(ValueError):
+            get_curve("Unknown")
+
+        point = deepcopy(self.curve.mul_point(42, self.curve.G))
+        self.assertIs(point.curve, self.curve)
+        self.assertEqual(point, self.curve.mul_point(42, self.curve.G))
+        self.assertEqual(len({point, self.curve.mul_point(42, self.curve.G)}), 1)
+        self.assertFalse(hasattr(point, "__dict__"))
+
+    def test_point_encoding(self):
+        point = self.curve.mul_point(randint(1, self.curve.n - 1), self.curve.G)
+        for p in (point, -point, self.curve.G, self.curve.INF, Point(0, 0, self.curve)):
+            data = p.to_bytes()
+            self.assertEqual(len(data), 33)
+            self.assertEqual(Point.from_bytes(data), p)
+            self.assertEqual(Point.from_bytes(bytearray(data), self.curve), p)
+
+        with self.assertRaises(ValueError):
+            Point.from_bytes(point.to_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            Point.from_bytes(b"\x05" + point.to_bytes()[1:])
+        # x = 2 is not the x-coordinate of any point of Curve25519.
+        with self.assertRaises(ValueError):
+            Point.from_bytes(b"\x02" + (2).to_bytes(32, "big"))
+        # Non-canonical encodings: x + p and the odd prefix for y == 0.
+        with self.assertRaises(ValueError):
+            Point.from_bytes(point.to_bytes()[:1] + (point.x + self.curve.p).to_bytes(32, "big"))
+        with self.assertRaises(ValueError):
+            Point.from_bytes(b"\x03" + bytes(32))
+
+
+if __name__ == '__main__':
+    unittest.main()
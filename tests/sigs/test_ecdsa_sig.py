@@ -24,6 +24,33 @@ class ECDSATestCase(unittest.TestCase):
         # False
         self.assertFalse(sign.verify(public_keys_list[0], msg, *signature))
 
+    def test_verify_batch(self):
+        sign = ECDSA()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(4)]
+        items = []
+        for idx, (pk, pbk) in enumerate(keys):
+            msg = f"Message {idx % 2}"
+            items.append((pbk, msg, sign.sign(pk, msg)))
+        # Wrong key, wrong message, out of range signature.
+        items.append((keys[1][1], items[0][1], items[0][2]))
+        items.append((keys[2][1], "Another message", items[2][2]))
+        items.append((keys[3][1], items[3][1], (items[3][2][0], 0)))
+
+        expected = [sign.verify(pbk, msg, *sig) for pbk, msg, sig in items]
+        self.assertEqual(expected, [True] * 4 + [False] * 3)
+        self.assertEqual(sign.verify_batch(items), expected)
+        self.assertEqual(sign.verify_batch([]), [])
+
+    def test_signature_encoding(self):
+        sign = ECDSA()
+        pk, pbk = KeyPairGenerator().gen_keypair()
+        signature = sign.sign(pk, "Message")
+        data = sign.signature_to_bytes(signature)
+        self.assertEqual(len(data), 64)
+        self.assertEqual(sign.signature_from_bytes(data), signature)
+        with self.assertRaises(ValueError):
+            sign.signature_from_bytes(data[1:])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from random import randint
+
+from signature_algorithms.curve import MontgomeryCurve
+from signature_algorithms.fixed_base import FixedBaseTable, TABLE_MAGIC, TABLE_VERSION
+
+
+class FixedBaseTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.curve = MontgomeryCurve()
+        cls.table = FixedBaseTable(cls.curve, cls.curve.G)
+        cls.point = cls.curve.mul_point(12345, cls.curve.G)
+
+    def test_matches_generic_multiplication(self):
+        for _ in range(5):
+            d = randint(1, self.curve.n - 1)
+            # d * point / 12345 is computed by the generic path, the point is not G.
+            expected = self.curve.mul_point(d * pow(12345, -1, self.curve.n) % self.curve.n, self.point)
+            self.assertEqual(self.table.mul(d), expected)
+        self.assertTrue(self.table.mul(0).is_ideal_point())
+        self.assertTrue(self.table.mul(self.curve.n).is_ideal_point())
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "g.table")
+            self.table.save(path)
+            d = randint(1, self.curve.n - 1)
+
+            loaded = FixedBaseTable.load(path, self.curve)
+            self.assertEqual(loaded.mul(d), self.table.mul(d))
+
+            mapped = FixedBaseTable.load(path, self.curve, use_mmap=True)
+            self.assertEqual(mapped.mul(d), self.table.mul(d))
+            mapped.entries.close()
+
+            curve = MontgomeryCurve()
+            curve.use_base_table_file(path)
+            self.assertEqual(curve.mul_point(d, curve.G), self.table.mul(d))
+
+    def test_load_rejects_corrupted_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "g.table")
+            self.table.save(path)
+            with open(path, "r+b") as file:
+                file.seek(-1, os.SEEK_END)
+                file.write(b"\x00")
+            with self.assertRaises(ValueError):
+                FixedBaseTable.load(path, self.curve)
+
+            # Files shorter than the header, with and without mmap.
+            for data in (b"", TABLE_MAGIC, TABLE_MAGIC + bytes([TABLE_VERSION])):
+                with open(path, "wb") as file:
+                    file.write(data)
+                for use_mmap in (False, True):
+                    with self.assertRaises(ValueError):
+                        FixedBaseTable.load(path, self.curve, use_mmap)
+
+    def test_other_curve(self):
+        # A small curve: 2-byte coordinates, G = (3, 239) has order 244.
+        curve = MontgomeryCurve(name="Small", a=3, p=1019, n=244, G_x=3, G_y=239)
+        table = FixedBaseTable(curve, curve.G)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "small.table")
+            table.save(path)
+            entries_count = table.windows_count * table.row_size
+            self.assertEqual(os.path.getsize(path), len(table.header()) + entries_count * 2 * 2)
+            for use_mmap in (False, True):
+                loaded = FixedBaseTable.load(path, curve, use_mmap)
+                for d in range(1, curve.n):
+                    self.assertEqual(loaded.mul(d), curve.mul_point(d, curve.G))
+                if use_mmap:
+                    loaded.entries.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
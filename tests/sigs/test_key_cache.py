@@ -0,0 +1,43 @@
+import unittest
+from random import randint
+
+from signature_algorithms.curve import MontgomeryCurve
+from signature_algorithms.ecdsa_signature import ECDSA
+from signature_algorithms.key_cache import PublicKeyTableCache
+from signature_algorithms.key_pair import KeyPairGenerator
+
+
+class PublicKeyTableCacheTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.curve = MontgomeryCurve()
+        cls.points = [cls.curve.mul_point(randint(1, cls.curve.n - 1), cls.curve.G) for _ in range(3)]
+
+    def test_multi_mul_with_cache(self):
+        cache = PublicKeyTableCache(max_size=2, promote_after=2)
+        for _ in range(4):
+            pairs = [(randint(1, self.curve.n - 1), p) for p in self.points[:2]] + [(-5, self.points[1])]
+            self.assertEqual(self.curve.multi_mul(pairs, cache), self.curve.multi_mul(pairs))
+        self.assertEqual(cache.stats(), {"hits": 10, "misses": 2, "evictions": 0, "promotions": 2, "size": 2})
+
+        self.curve.multi_mul([(3, self.points[2])], cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertNotIn(self.points[0], cache.tables)
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "promotions": 0, "size": 0})
+
+    def test_verification_of_hot_keys(self):
+        cache = PublicKeyTableCache()
+        sign = ECDSA(key_cache=cache)
+        private_key, public_key = KeyPairGenerator().gen_keypair()
+        signature = sign.sign(private_key, "message")
+        for _ in range(cache.promote_after + 2):
+            self.assertTrue(sign.verify(public_key, "message", *signature))
+            self.assertFalse(sign.verify(public_key, "other message", *signature))
+        self.assertEqual(cache.promotions, 1)
+        self.assertEqual(cache.misses, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
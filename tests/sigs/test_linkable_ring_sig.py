@@ -0,0 +1,54 @@
+import unittest
+
+from signature_algorithms.curve import MontgomeryCurve, Point
+from signature_algorithms.key_pair import KeyPairGenerator
+from signature_algorithms.linkable_ring_signature import LinkableRingSignature, hash_to_point
+
+
+class LinkableRingSignatureTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.sign = LinkableRingSignature()
+        cls.keys = [KeyPairGenerator().gen_keypair() for _ in range(3)]
+        cls.public_keys_list = [pbk for _, pbk in cls.keys]
+
+    def test_sign_and_verify(self):
+        message = "This is a linkable ring signature"
+        for test_index in range(len(self.keys)):
+            signature = self.sign.sign(message, self.public_keys_list, self.keys[test_index][0], test_index)
+            self.assertTrue(self.sign.verify(message, self.public_keys_list, *signature))
+            self.assertFalse(self.sign.verify("Other message", self.public_keys_list, *signature))
+
+        ring = self.sign.prepare_ring(self.public_keys_list)
+        signature = self.sign.sign(message, ring, self.keys[1][0], 1)
+        self.assertTrue(self.sign.verify(message, self.public_keys_list, *signature))
+
+    def test_linkability(self):
+        first = self.sign.sign("first", self.public_keys_list, self.keys[0][0], 0)
+        second = self.sign.sign("second", self.public_keys_list[::-1], self.keys[0][0], 2)
+        other = self.sign.sign("first", self.public_keys_list, self.keys[1][0], 1)
+        self.assertTrue(self.sign.is_linked(first, second))
+        self.assertFalse(self.sign.is_linked(first, other))
+
+    def test_forged_key_image(self):
+        message = "This is a linkable ring signature"
+        e_0, ss, key_image = self.sign.sign(message, self.public_keys_list, self.keys[0][0], 0)
+        curve = MontgomeryCurve()
+        self.assertFalse(self.sign.verify(message, self.public_keys_list, e_0, ss, key_image + curve.G))
+        self.assertFalse(self.sign.verify(message, self.public_keys_list, e_0, ss, curve.INF))
+        # (0, 0) has order 2, adding it gives another image of the same key.
+        self.assertFalse(self.sign.verify(message, self.public_keys_list, e_0, ss,
+                                          key_image + Point(0, 0, curve)))
+        # The same point with x + p encodes differently, it must not pass for a new image.
+        shifted = Point._unchecked(key_image.x + curve.p, key_image.y, curve)
+        self.assertFalse(self.sign.verify(message, self.public_keys_list, e_0, ss, shifted))
+
+    def test_hash_to_point(self):
+        curve = MontgomeryCurve()
+        point = hash_to_point(self.public_keys_list[0])
+        self.assertTrue(curve.mul_point(curve.n, point).is_ideal_point())
+        self.assertNotEqual(point, hash_to_point(self.public_keys_list[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 
+from signature_algorithms.curve import Point
 from signature_algorithms.key_pair import KeyPairGenerator
 from signature_algorithms.ring_signature import RingSignature
 
@@ -21,6 +22,65 @@ class RingSignatureTestCase(unittest.TestCase):
         signature = sign.sign(message, public_keys_list, private_keys[test_index], test_index)
         self.assertTrue(sign.verify(message, public_keys_list, *signature))
 
+    def test_prepared_ring(self):
+        sign = RingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(4)]
+        public_keys_list = [pbk for _, pbk in keys]
+        ring = sign.prepare_ring(public_keys_list)
+
+        pairs = []
+        for idx, (pk, _) in enumerate(keys):
+            message = f"Bid {idx}"
+            pairs.append((message, sign.sign(message, ring if idx % 2 else public_keys_list, pk, idx)))
+        pairs.append(("Bid 5", pairs[0][1]))
+
+        expected = [sign.verify(message, public_keys_list, *signature) for message, signature in pairs]
+        self.assertEqual(expected, [True] * 4 + [False])
+        self.assertEqual(sign.verify_many(pairs, ring), expected)
+        self.assertEqual(sign.verify_many(pairs, public_keys_list), expected)
+
+    def test_prepared_ring_small_order_member(self):
+        sign = RingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(3)]
+        # (0, 0) has order 2, the member is outside the prime-order subgroup.
+        public_keys_list = [pbk for _, pbk in keys]
+        public_keys_list[1] = public_keys_list[1] + Point(0, 0, sign.curve)
+        ring = sign.prepare_ring(public_keys_list)
+        self.assertIsNone(ring.tables[1])
+        self.assertIsNotNone(ring.tables[0])
+
+        # A reduction of the scalar modulo n would drop the small-order component.
+        for e in (sign.curve.n + 1, 7, -3):
+            self.assertEqual(sign._commitment(5, e, ring, 1), sign._commitment(5, e, public_keys_list, 1))
+        signature = sign.sign("Bid", ring, keys[0][0], 0)
+        self.assertTrue(sign.verify("Bid", public_keys_list, *signature))
+        self.assertTrue(sign.verify("Bid", ring, *signature))
+
+    def test_streaming(self):
+        sign = RingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(5)]
+        public_keys_list = [pbk for _, pbk in keys]
+        message = "This is a ring signature"
+
+        for test_index in (0, 2, 4):
+            packed = sign.sign_stream(message, public_keys_list, keys[test_index][0], test_index)
+            self.assertEqual(len(packed), 4 + 6 * 32)
+            self.assertTrue(sign.verify_stream(message, iter(public_keys_list), packed))
+            self.assertTrue(sign.verify(message, public_keys_list, *sign.unpack_signature(packed)))
+            self.assertFalse(sign.verify_stream("Other message", iter(public_keys_list), packed))
+            self.assertFalse(sign.verify_stream(message, iter(public_keys_list[:-1]), packed))
+            self.assertFalse(sign.verify_stream(message, iter(public_keys_list + public_keys_list[:1]), packed))
+
+        signature = sign.sign(message, public_keys_list, keys[1][0], 1)
+        packed = sign.pack_signature(*signature)
+        self.assertEqual(sign.unpack_signature(packed), signature)
+        self.assertTrue(sign.verify_stream(message, (pbk for pbk in public_keys_list), packed))
+
+        with self.assertRaises(ValueError):
+            sign.sign_stream(message, iter(public_keys_list), keys[0][0], 0)
+        with self.assertRaises(ValueError):
+            sign.unpack_signature(packed[:-1])
+
 
 if __name__ == '__main__':
     unittest.main()
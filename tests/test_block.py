@@ -1,8 +1,11 @@
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 from time import time
 
 from blockchain.account import Account
-from blockchain.block import Block
+from blockchain.block import Block, HEADER_SIZE
+from blockchain.blockchain import ConsensusAlgorithms
+from blockchain.hash import Hash
 from blockchain.transaction.operation import Operation
 from blockchain.transaction.transaction import Transaction
 
@@ -83,6 +86,61 @@ class BlockTestCase(unittest.TestCase):
         # Add normal tx, but it's forbidden to add transactions after coinbase
         self.assertFalse(self.bl_gen.add_transaction(tx2))
 
+    def test_parallel_signature_checks(self):
+        self.first.update_balance(20)
+        op1, _ = self.op_gen.create_payment_operation(self.first, self.second, 5, self.first.wallet[0])
+        op2, _ = self.op_gen.create_payment_operation(self.first, self.second, 8, self.first.wallet[0])
+        tx1 = self.tx_gen.crete_transaction([op1, op2], 255)
+        self.assertTrue(self.bl_gen.add_transaction(tx1))
+        self.assertTrue(self.bl_gen.add_coinbase_transaction(self.first, 10))
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = self.bl_gen.verify_signatures(executor)
+        self.assertEqual(parallel, self.bl_gen.verify_signatures())
+        self.assertEqual(parallel[id(tx1)], [True, True])
+
+    def test_header(self):
+        self.first.update_balance(20)
+        op1, _ = self.op_gen.create_payment_operation(self.first, self.second, 5, self.first.wallet[0])
+        tx1 = self.tx_gen.crete_transaction([op1], 255)
+        self.assertTrue(self.bl_gen.add_transaction(tx1))
+        empty_root = self.bl_gen.get_transactions_root()
+
+        block = ConsensusAlgorithms(10).proof_of_work(self.bl_gen, self.first)
+        self.assertEqual(len(block.header()), HEADER_SIZE)
+        self.assertTrue(block.header().startswith(block.header_prefix()))
+        self.assertEqual(block.block_id, Hash.to_sha1(block.header()))
+        self.assertLess(int(block.block_id, 16), block.target)
+        self.assertNotEqual(block.get_transactions_root(), empty_root)
+        self.assertTrue(block.verify_block())
+
+        # The id no longer matches the header.
+        block.nonce += 1
+        self.assertFalse(block.verify_block())
+        block.nonce -= 1
+        block.timestamp += 1
+        self.assertFalse(block.verify_block())
+
+    def test_encoding(self):
+        self.first.update_balance(20)
+        op1, _ = self.op_gen.create_payment_operation(self.first, self.second, 5, self.first.wallet[0])
+        tx1 = self.tx_gen.crete_transaction([op1], 255)
+        self.assertTrue(self.bl_gen.add_transaction(tx1))
+        block = ConsensusAlgorithms(10).proof_of_work(self.bl_gen, self.first)
+        data = block.to_bytes()
+
+        decoded = Block.from_bytes(data, {self.first.account_id: self.first})
+        self.assertEqual(decoded.block_id, block.block_id)
+        self.assertEqual(decoded.header(), block.header())
+        self.assertEqual(decoded.set_of_transactions, block.set_of_transactions)
+        self.assertEqual(decoded.to_bytes(), data)
+        self.assertTrue(decoded.verify_block())
+
+        with self.assertRaises(ValueError):
+            Block.from_bytes(data[:-1])
+        with self.assertRaises(ValueError):
+            Block.from_bytes(data + b"\x00")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,177 @@
+import os
+import tempfile
+import unittest
+from time import time
+from unittest import mock
+
+from blockchain.account import Account
+from blockchain.block import Block
+from blockchain.block_store import BlockStore, DATA_FILE, INDEX_FILE, INDEX_RECORD_SIZE, ID_TABLE_FILE, \
+    ID_TABLE_HEADER_SIZE
+from blockchain.blockchain import Blockchain, ConsensusAlgorithms
+from blockchain.transaction.operation import Operation
+from blockchain.transaction.transaction import Transaction
+
+
+class BlockStoreTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        account_gen = Account()
+        cls.first = account_gen.get_account()
+        cls.second = account_gen.get_account()
+        cls.first.update_balance(20)
+        op, _ = Operation().create_payment_operation(cls.first, cls.second, 5, cls.first.wallet[0])
+        tx = Transaction().crete_transaction([op], 1)
+
+        cls.blocks = []
+        prev_hash = '0x0000000000000000000000000000000000000000'
+        for i in range(3):
+            block = Block(int(time()), prev_hash)
+            if i == 1:
+                block.add_transaction(tx)
+            block = ConsensusAlgorithms(10).proof_of_work(block, cls.first)
+            cls.blocks.append(block)
+            prev_hash = block.block_id
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def fill(self) -> BlockStore:
+        store = BlockStore(self.directory)
+        for block in self.blocks:
+            store.append(block)
+        return store
+
+    def assertStored(self, store: BlockStore, blocks: list):
+        self.assertEqual(len(store), len(blocks))
+        self.assertEqual([bytes(store.block_bytes(i)) for i in range(len(store))],
+                         [block.to_bytes() for block in blocks])
+        self.assertEqual([block.block_id for block in store], [block.block_id for block in blocks])
+
+    def test_sequence(self):
+        store = self.fill()
+        self.assertStored(store, self.blocks)
+        self.assertEqual(store[-1].block_id, self.blocks[-1].block_id)
+        self.assertIs(store[1], store[1])
+        self.assertEqual([block.block_id for block in store[1:]], [block.block_id for block in self.blocks[1:]])
+        self.assertEqual(store.view(1).transaction_ids(), [tx.transaction_id for tx in store[1].set_of_transactions])
+        self.assertIn(self.blocks[2], store)
+        self.assertEqual(store.height_of(self.blocks[1].block_id), 1)
+        with self.assertRaises(IndexError):
+            store[3]
+        store.close()
+
+    def test_reopen(self):
+        self.fill().close()
+        store = BlockStore(self.directory, {self.first.account_id: self.first})
+        self.assertStored(store, self.blocks)
+        self.assertIs(store[1].set_of_transactions[0].set_of_operations[0].sender, self.first)
+        self.assertIn(self.blocks[0], store)
+        store.close()
+
+    def assertIdsFound(self, store: BlockStore, blocks: list):
+        for height, block in enumerate(blocks):
+            self.assertEqual(store.height_of(block.block_id), height)
+        self.assertIsNone(store.height_of("00" * 20))
+
+    def test_id_table(self):
+        # A tiny table, so it is grown by the appends.
+        with mock.patch("blockchain.block_store.ID_TABLE_MIN_CAPACITY", 2):
+            self.fill().close()
+            ids_path = os.path.join(self.directory, ID_TABLE_FILE)
+            store = BlockStore(self.directory)
+            self.assertIdsFound(store, self.blocks)
+            store.close()
+
+            # The table lags behind the index: the missing ids are inserted on open.
+            with open(ids_path, "r+b") as file:
+                file.seek(ID_TABLE_HEADER_SIZE - 8)
+                file.write((1).to_bytes(8, "big"))
+            store = BlockStore(self.directory)
+            self.assertIdsFound(store, self.blocks)
+            store.close()
+
+            # A damaged table is rebuilt from the index.
+            with open(ids_path, "r+b") as file:
+                file.truncate(10)
+            store = BlockStore(self.directory)
+            self.assertIdsFound(store, self.blocks)
+            store.close()
+            os.remove(ids_path)
+            store = BlockStore(self.directory)
+            self.assertIdsFound(store, self.blocks)
+            store.close()
+
+    def test_torn_append(self):
+        self.fill().close()
+        data_path = os.path.join(self.directory, DATA_FILE)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+
+        # The last block record is only partly written and not indexed yet.
+        with open(index_path, "r+b") as file:
+            file.truncate(2 * INDEX_RECORD_SIZE)
+        with open(data_path, "r+b") as file:
+            file.truncate(os.path.getsize(data_path) - 10)
+        store = BlockStore(self.directory)
+        self.assertStored(store, self.blocks[:2])
+        self.assertIsNone(store.height_of(self.blocks[2].block_id))
+        store.append(self.blocks[2])
+        store.close()
+
+        # The last block record is written but not indexed.
+        with open(index_path, "r+b") as file:
+            file.truncate(2 * INDEX_RECORD_SIZE + 5)
+        store = BlockStore(self.directory)
+        self.assertStored(store, self.blocks)
+        self.assertIdsFound(store, self.blocks)
+        store.close()
+
+    def test_corrupted_record(self):
+        self.fill().close()
+        data_path = os.path.join(self.directory, DATA_FILE)
+        with open(data_path, "r+b") as file:
+            file.seek(-1, os.SEEK_END)
+            last = file.read(1)
+            file.seek(-1, os.SEEK_END)
+            file.write(bytes([last[0] ^ 0xff]))
+        store = BlockStore(self.directory)
+        self.assertStored(store, self.blocks[:2])
+        store.close()
+
+    def test_blockchain_history(self):
+        store = BlockStore(self.directory)
+        blockchain = Blockchain(block_history=store)
+        self.assertEqual(len(store), 1)
+        added = {account.account_id: account.get_balance for account in (self.first, self.second)}
+        blockchain.add_account(self.first)
+        blockchain.add_account(self.second)
+
+        op, _ = Operation().create_payment_operation(self.first, self.second, 3, self.first.wallet[1])
+        block = Block(int(time()), blockchain.get_lat_block().block_id)
+        block.add_transaction(Transaction().crete_transaction([op], 2))
+        block = ConsensusAlgorithms(10).proof_of_work(block, self.first)
+        self.assertTrue(blockchain.validate_block(block))
+        self.assertEqual(blockchain.get_lat_block().block_id, block.block_id)
+        state = blockchain.get_account_state()
+        store.close()
+
+        # The history is replayed on start instead of creating a new genesis block.
+        store = BlockStore(self.directory)
+        restored = Blockchain(block_history=store)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(restored.get_lat_block().block_id, block.block_id)
+        self.assertEqual(restored.tx_database, blockchain.tx_database)
+        # The whole state, the genesis block included (the balances given by add_account aren't in the history).
+        for account_id, balance in added.items():
+            state[account_id] -= balance
+        self.assertEqual(restored.get_account_state(), state)
+        self.assertFalse(restored.validate_block(block))
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
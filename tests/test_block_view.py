@@ -0,0 +1,58 @@
+import unittest
+from time import time
+
+from blockchain.account import Account
+from blockchain.block import Block
+from blockchain.block_view import BlockView
+from blockchain.blockchain import ConsensusAlgorithms
+from blockchain.transaction.operation import Operation
+from blockchain.transaction.transaction import Transaction
+
+
+class BlockViewTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        account_gen = Account()
+        cls.first = account_gen.get_account()
+        cls.second = account_gen.get_account()
+        cls.first.update_balance(20)
+        op_gen = Operation()
+        op1, _ = op_gen.create_payment_operation(cls.first, cls.second, 5, cls.first.wallet[0])
+        op2, _ = op_gen.create_payment_operation(cls.first, cls.second, 3, cls.first.wallet[1])
+        tx1 = Transaction().crete_transaction([op1, op2], 255)
+        block = Block(int(time()), '0x0000000000000000000000000000000000000000')
+        block.add_transaction(tx1)
+        cls.block = ConsensusAlgorithms(10).proof_of_work(block, cls.first)
+        cls.data = cls.block.to_bytes()
+
+    def test_header_fields(self):
+        view = BlockView(self.data)
+        self.assertEqual(view.block_id, self.block.block_id)
+        self.assertEqual(view.prev_hash, "0" * 40)
+        self.assertEqual((view.version, view.timestamp, view.target, view.nonce),
+                         (self.block.version, self.block.timestamp, self.block.target, self.block.nonce))
+        self.assertEqual(bytes(view.transactions_root), self.block.get_transactions_root())
+        self.assertEqual(bytes(view.header), self.block.header())
+
+    def test_lazy_transactions(self):
+        view = BlockView(bytearray(self.data), {self.first.account_id: self.first})
+        self.assertEqual(len(view), len(self.block.set_of_transactions))
+        self.assertEqual(view.transaction_ids(), [tx.transaction_id for tx in self.block.set_of_transactions])
+        self.assertEqual(bytes(view.transaction_bytes(1)), self.block.set_of_transactions[1].to_bytes())
+
+        self.assertIs(view[0], view[0])
+        self.assertEqual(list(view), self.block.set_of_transactions)
+        self.assertTrue(view[0].verify_transaction())
+        self.assertTrue(view[-1].verify_transaction(coinbase=True))
+        self.assertEqual(view.to_block().to_bytes(), self.data)
+
+    def test_corrupted_buffer(self):
+        with self.assertRaises(ValueError):
+            BlockView(self.data[:50])
+        view = BlockView(self.data[:-1])
+        with self.assertRaises(ValueError):
+            view.transaction_id(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
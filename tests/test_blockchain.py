@@ -1,11 +1,16 @@
+import threading
 import unittest
 from time import time
 
 from blockchain.account import Account
 from blockchain.block import Block
-from blockchain.blockchain import Blockchain, ConsensusAlgorithms
+from blockchain.blockchain import Blockchain, ConsensusAlgorithms, NUMPY_ENGINE
+from blockchain.hash import Hash
 from blockchain.transaction.operation import Operation
 from blockchain.transaction.transaction import Transaction
+from signature_algorithms.curve import Point
+from signature_algorithms.key_pair import KeyPairGenerator
+from signature_algorithms.linkable_ring_signature import LinkableRingSignature
 
 
 class BlockchainTestCase(unittest.TestCase):
@@ -64,6 +69,76 @@ class BlockchainTestCase(unittest.TestCase):
         self.assertEqual(self.first.get_balance, 94)  # first: 57 - 13 + 50
         self.assertEqual(self.second.get_balance, 39)  # second: 26 + 13
 
+    def test_parallel_validation(self):
+        blockchain = Blockchain(verify_workers=2)
+        self.first.update_balance(20)
+        blockchain.add_account(self.first)
+        blockchain.add_account(self.second)
+
+        op1, _ = self.op_gen.create_payment_operation(self.first, self.second, 5, self.first.wallet[0])
+        tx1 = self.tx_gen.crete_transaction([op1], 255)
+        block1 = Block(int(time()), blockchain.get_lat_block().block_id)
+        block1.add_transaction(tx1)
+        block1 = ConsensusAlgorithms(50).proof_of_work(block1, self.first)
+        self.assertTrue(blockchain.validate_block(block1))
+        self.assertEqual(blockchain.coin_database[self.second.account_id], 5)
+        blockchain.close()
+
+    def test_parallel_mining(self):
+        self.blockchain.add_account(self.first)
+        block = Block(int(time()), self.blockchain.get_lat_block().block_id, target=1 << 150)
+        mined = ConsensusAlgorithms(50, workers=2).proof_of_work(block, self.first)
+        self.assertIsInstance(mined, Block)
+        self.assertEqual(mined.block_id, Hash.to_sha1(mined.header()))
+        self.assertLess(int(mined.block_id, 16), mined.target)
+        self.assertTrue(self.blockchain.validate_block(mined))
+
+    def test_numpy_mining(self):
+        self.blockchain.add_account(self.first)
+        block = Block(int(time()), self.blockchain.get_lat_block().block_id, target=1 << 150)
+        mined = ConsensusAlgorithms(50, engine=NUMPY_ENGINE).proof_of_work(block, self.first)
+        self.assertLess(int(mined.block_id, 16), mined.target)
+        self.assertTrue(self.blockchain.validate_block(mined))
+        with self.assertRaises(ValueError):
+            ConsensusAlgorithms(50, engine="unknown").proof_of_work(Block(int(time()), mined.block_id), self.first)
+
+    def test_mining_cancel(self):
+        cancel = threading.Event()
+        for workers in (0, 2):
+            cancel.clear()
+            # No nonce can reach this target, only the cancel event ends the search.
+            block = Block(int(time()), self.blockchain.get_lat_block().block_id, target=1)
+            result = []
+            miner = threading.Thread(target=lambda: result.append(
+                ConsensusAlgorithms(50, workers=workers).proof_of_work(block, self.first, cancel)))
+            miner.start()
+            cancel.set()
+            miner.join(timeout=10)
+            self.assertFalse(miner.is_alive())
+            self.assertEqual(result, [None])
+
+    def test_key_images(self):
+        sign = LinkableRingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(3)]
+        public_keys_list = [pbk for _, pbk in keys]
+
+        first = sign.sign("bid 10", public_keys_list, keys[1][0], 1)
+        self.assertTrue(self.blockchain.accept_ring_signature("bid 10", public_keys_list, first))
+        self.assertIn(first[2], self.blockchain.key_images)
+        # The same key can't sign again, whatever the message.
+        second = sign.sign("bid 20", public_keys_list, keys[1][0], 1)
+        self.assertFalse(self.blockchain.accept_ring_signature("bid 20", public_keys_list, second))
+        # Nor with its key image written with the unreduced x-coordinate.
+        image = second[2]
+        shifted = Point._unchecked(image.x + image.curve.p, image.y, image.curve)
+        self.assertFalse(self.blockchain.accept_ring_signature("bid 20", public_keys_list,
+                                                               (second[0], second[1], shifted)))
+
+        third = sign.sign("bid 30", public_keys_list, keys[2][0], 2)
+        self.assertFalse(self.blockchain.accept_ring_signature("bid 40", public_keys_list, third))
+        self.assertTrue(self.blockchain.accept_ring_signature("bid 30", public_keys_list, third))
+        self.assertEqual(len(self.blockchain.key_images), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
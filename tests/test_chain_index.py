@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from time import time
+
+from blockchain.account import Account
+from blockchain.block import Block
+from blockchain.block_store import BlockStore
+from blockchain.blockchain import Blockchain, ConsensusAlgorithms
+from blockchain.chain_index import ChainIndex
+from blockchain.transaction.operation import Operation
+from blockchain.transaction.transaction import Transaction
+
+
+class ChainIndexTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        account_gen = Account()
+        cls.first = account_gen.get_account()
+        cls.second = account_gen.get_account()
+        cls.first.update_balance(20)
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def add_payment(self, blockchain: Blockchain, amount: int, key_index: int) -> Block:
+        op, _ = Operation().create_payment_operation(self.first, self.second, amount, self.first.wallet[key_index])
+        block = Block(int(time()), blockchain.get_lat_block().block_id)
+        block.add_transaction(Transaction().crete_transaction([op], key_index))
+        block = ConsensusAlgorithms(10).proof_of_work(block, self.first)
+        self.assertTrue(blockchain.validate_block(block))
+        return block
+
+    def test_lookups(self):
+        index = ChainIndex()
+        blockchain = Blockchain(chain_index=index)
+        blockchain.add_account(self.first)
+        blockchain.add_account(self.second)
+        block = self.add_payment(blockchain, 2, 0)
+        payment, coinbase = block.set_of_transactions
+
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.block_height(blockchain.block_history[0].block_id), 0)
+        self.assertEqual(index.block_height(block.block_id), 1)
+        self.assertIsNone(index.block_height("00" * 20))
+        self.assertEqual(index.transaction_location(payment.transaction_id), (1, 0))
+        self.assertEqual(index.transaction_location(coinbase.transaction_id), (1, 1))
+        self.assertEqual(blockchain.block_history[1].set_of_transactions[1], coinbase)
+        self.assertIsNone(index.transaction_location("00" * 20))
+        self.assertEqual(index.account_transactions(self.second.account_id), [payment.transaction_id])
+        self.assertEqual(sorted(index.account_transactions(self.first.account_id)),
+                         sorted([payment.transaction_id, coinbase.transaction_id]))
+
+        self.assertTrue(blockchain.has_block(block))
+        self.assertTrue(blockchain.has_transaction(payment))
+        self.assertFalse(blockchain.has_block(Block(int(time()), block.block_id, block_id="00" * 20)))
+        index.close()
+
+    def test_catch_up(self):
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        blockchain = Blockchain(block_history=store)
+        blockchain.add_account(self.first)
+        blockchain.add_account(self.second)
+        block = self.add_payment(blockchain, 1, 1)
+        store.close()
+
+        # The blocks added while the index was not in use are indexed on start, the index is kept on disk.
+        index_path = os.path.join(self.directory, "index.sqlite")
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        index = ChainIndex(index_path)
+        Blockchain(block_history=store, chain_index=index)
+        self.assertEqual(len(index), 2)
+        index.close()
+        index = ChainIndex(index_path)
+        self.assertEqual(index.block_height(block.block_id), 1)
+        self.assertEqual(index.transaction_location(block.set_of_transactions[0].transaction_id), (1, 0))
+        index.close()
+        store.close()
+
+    def test_another_history(self):
+        index_path = os.path.join(self.directory, "index.sqlite")
+        for _ in range(2):
+            # A list history starts with a new genesis block every time, the index is rebuilt.
+            index = ChainIndex(index_path)
+            blockchain = Blockchain(chain_index=index)
+            self.assertEqual(len(index), 1)
+            self.assertEqual(index.block_height(blockchain.get_lat_block().block_id), 0)
+            index.close()
+
+        # An index of a longer history.
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        index = ChainIndex(index_path)
+        blockchain = Blockchain(block_history=store, chain_index=index)
+        blockchain.add_account(self.first)
+        blockchain.add_account(self.second)
+        self.add_payment(blockchain, 1, 0)
+        self.assertEqual(len(index), 2)
+        index.close()
+        store.close()
+        index = ChainIndex(index_path)
+        store = BlockStore(os.path.join(self.directory, "other"))
+        Blockchain(block_history=store, chain_index=index)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.block_id(0), store[0].block_id)
+        index.close()
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
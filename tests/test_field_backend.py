@@ -0,0 +1,56 @@
+import random
+import unittest
+
+from features import field_backend
+from signature_algorithms.ecdsa_signature import ECDSA
+from signature_algorithms.key_cache import PublicKeyTableCache
+from signature_algorithms.key_pair import KeyPairGenerator
+from signature_algorithms.ring_signature import RingSignature
+
+
+class FieldBackendTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.backend = field_backend.get_backend()
+
+    def tearDown(self) -> None:
+        field_backend.set_backend(self.backend)
+
+    def compute_everything(self):
+        random.seed(2022)
+        curve = ECDSA().curve
+        private_keys = [random.randint(1, curve.n - 1) for _ in range(3)]
+        public_keys = [KeyPairGenerator.get_public_key(d, curve) for d in private_keys]
+
+        ecdsa = ECDSA(key_cache=PublicKeyTableCache())
+        signature = ecdsa.sign(private_keys[0], "Message")
+        verified = [ecdsa.verify(pbk, "Message", *signature) for pbk in public_keys]
+
+        ring = RingSignature()
+        ring_signature = ring.sign("Message", public_keys, private_keys[1], 1)
+        ring_verified = ring.verify("Message", public_keys, *ring_signature)
+
+        return public_keys, signature, verified, ring_signature, ring_verified
+
+    def test_backend_selection(self):
+        self.assertIn(field_backend.get_backend(), field_backend.available_backends())
+        self.assertIn(field_backend.PYTHON, field_backend.available_backends())
+        with self.assertRaises(ValueError):
+            field_backend.set_backend("unknown")
+
+    def test_backends_give_identical_results(self):
+        if field_backend.GMPY2 not in field_backend.available_backends():
+            self.skipTest("gmpy2 is not installed")
+
+        results = {}
+        for backend in field_backend.available_backends():
+            field_backend.set_backend(backend)
+            results[backend] = self.compute_everything()
+
+        self.assertEqual(results[field_backend.GMPY2], results[field_backend.PYTHON])
+        _, _, verified, _, ring_verified = results[field_backend.PYTHON]
+        self.assertEqual(verified, [True, False, False])
+        self.assertTrue(ring_verified)
+
+
+if __name__ == '__main__':
+    unittest.main()
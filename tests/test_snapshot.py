@@ -0,0 +1,163 @@
+import os
+import tempfile
+import unittest
+from time import time
+
+from blockchain.account import Account
+from blockchain.block import Block
+from blockchain.block_store import BlockStore
+from blockchain.blockchain import Blockchain, ConsensusAlgorithms
+from blockchain.snapshot import StateSnapshot, save_snapshot, load_snapshot, list_snapshots, SNAPSHOT_FILE, \
+    KEY_IMAGE_LOG_FILE, load_key_images
+from blockchain.transaction.operation import Operation
+from blockchain.transaction.transaction import Transaction
+from signature_algorithms.key_pair import KeyPairGenerator
+from signature_algorithms.linkable_ring_signature import LinkableRingSignature
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+        self.snapshot = StateSnapshot(7, "ab" * 20, {"01" * 32: 15, "02" * 32: -3}, {"cd" * 20, "ef" * 20},
+                                      {b"\x02" + b"\x11" * 32}, 90)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_encoding(self):
+        self.assertEqual(StateSnapshot.from_bytes(self.snapshot.to_bytes()), self.snapshot)
+        data = bytearray(self.snapshot.to_bytes())
+        data[20] ^= 1
+        with self.assertRaises(ValueError):
+            StateSnapshot.from_bytes(bytes(data))
+        with self.assertRaises(ValueError):
+            StateSnapshot.from_bytes(self.snapshot.to_bytes()[:-1])
+
+    def test_save_and_load(self):
+        self.assertIsNone(load_snapshot(self.directory))
+        for height in (3, 5, 7):
+            self.snapshot.height = height
+            save_snapshot(self.directory, self.snapshot)
+        self.assertEqual(list_snapshots(self.directory), [7, 5])
+        self.assertEqual(load_snapshot(self.directory).height, 7)
+        self.assertEqual(load_snapshot(self.directory, 6).height, 5)
+
+        # A damaged snapshot is skipped.
+        with open(os.path.join(self.directory, SNAPSHOT_FILE % 7), "r+b") as file:
+            file.truncate(10)
+        self.assertEqual(load_snapshot(self.directory).height, 5)
+
+    def test_blockchain_startup(self):
+        account_gen = Account()
+        first = account_gen.get_account()
+        second = account_gen.get_account()
+        first.update_balance(20)
+
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        snapshot_dir = os.path.join(self.directory, "snapshots")
+        blockchain = Blockchain(block_history=store, snapshot_dir=snapshot_dir, snapshot_interval=2)
+        blockchain.add_account(first)
+        blockchain.add_account(second)
+        for i in range(2):
+            op, _ = Operation().create_payment_operation(first, second, 4, first.wallet[i])
+            block = Block(int(time()), blockchain.get_lat_block().block_id)
+            block.add_transaction(Transaction().crete_transaction([op], i))
+            block = ConsensusAlgorithms(10).proof_of_work(block, first)
+            self.assertTrue(blockchain.validate_block(block))
+        self.assertEqual(list_snapshots(snapshot_dir), [2])
+        tip = blockchain.get_lat_block().block_id
+        store.close()
+
+        # The state of the accounts added outside the history comes from the snapshot, the last block is replayed.
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        restored = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        self.assertEqual(restored.get_account_state(), blockchain.get_account_state())
+        self.assertEqual(restored.tx_database, blockchain.tx_database)
+        self.assertEqual(restored.get_lat_block().block_id, tip)
+        store.close()
+
+        # A snapshot of another history is ignored.
+        other = StateSnapshot(2, "00" * 20)
+        save_snapshot(snapshot_dir, other)
+        store = BlockStore(os.path.join(self.directory, "blocks"))
+        replayed = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        self.assertEqual(replayed.tx_database, blockchain.tx_database)
+        self.assertEqual(replayed.coin_database[second.account_id], 8)
+        store.close()
+
+    def test_key_images_survive_restart(self):
+        sign = LinkableRingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(2)]
+        public_keys_list = [pbk for _, pbk in keys]
+        blocks_dir = os.path.join(self.directory, "blocks")
+        snapshot_dir = os.path.join(self.directory, "snapshots")
+
+        store = BlockStore(blocks_dir)
+        blockchain = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        first = sign.sign("bid 10", public_keys_list, keys[0][0], 0)
+        self.assertTrue(blockchain.accept_ring_signature("bid 10", public_keys_list, first))
+        blockchain.save_snapshot()
+        self.assertEqual(os.path.getsize(os.path.join(snapshot_dir, KEY_IMAGE_LOG_FILE)), 0)
+        # Accepted after the last snapshot, only in the log.
+        second = sign.sign("bid 20", public_keys_list, keys[1][0], 1)
+        self.assertTrue(blockchain.accept_ring_signature("bid 20", public_keys_list, second))
+        store.close()
+
+        store = BlockStore(blocks_dir)
+        restored = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        self.assertEqual(len(restored.key_images), 2)
+        again = sign.sign("bid 30", public_keys_list, keys[1][0], 1)
+        self.assertFalse(restored.accept_ring_signature("bid 30", public_keys_list, again))
+        store.close()
+
+    def test_key_images_of_another_history(self):
+        sign = LinkableRingSignature()
+        keys = [KeyPairGenerator().gen_keypair() for _ in range(2)]
+        public_keys_list = [pbk for _, pbk in keys]
+        miner = Account().get_account()
+        blocks_dir = os.path.join(self.directory, "blocks")
+        snapshot_dir = os.path.join(self.directory, "snapshots")
+
+        store = BlockStore(blocks_dir)
+        blockchain = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        blockchain.add_account(miner)
+        block = ConsensusAlgorithms(10).proof_of_work(Block(int(time()), blockchain.get_lat_block().block_id), miner)
+        self.assertTrue(blockchain.validate_block(block))
+        first = sign.sign("bid 10", public_keys_list, keys[0][0], 0)
+        self.assertTrue(blockchain.accept_ring_signature("bid 10", public_keys_list, first))
+        blockchain.save_snapshot()
+        second = sign.sign("bid 20", public_keys_list, keys[1][0], 1)
+        self.assertTrue(blockchain.accept_ring_signature("bid 20", public_keys_list, second))
+        store.close()
+
+        # A new list history: the images of the stored one are not adopted, and its snapshots don't drop the log.
+        other = Blockchain(snapshot_dir=snapshot_dir)
+        self.assertEqual(len(other.key_images), 0)
+        other.save_snapshot()
+        self.assertEqual(load_key_images(snapshot_dir), {second[2].to_bytes()})
+
+        # Another stored history whose latest snapshot is from the first one.
+        store = BlockStore(os.path.join(self.directory, "other"))
+        Blockchain(block_history=store)
+        store.close()
+        store = BlockStore(os.path.join(self.directory, "other"))
+        replayed = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        self.assertEqual(len(replayed.key_images), 0)
+        replayed.save_snapshot()
+        self.assertEqual(load_key_images(snapshot_dir), {second[2].to_bytes()})
+        store.close()
+
+        # The first history still gets both images.
+        store = BlockStore(blocks_dir)
+        restored = Blockchain(block_history=store, snapshot_dir=snapshot_dir)
+        self.assertEqual(restored.key_images.images, {first[2].to_bytes(), second[2].to_bytes()})
+        store.close()
+
+    def test_snapshot_interval(self):
+        with self.assertRaises(ValueError):
+            Blockchain(snapshot_interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from random import randint
+
+from features.utils import mod_inv, batch_mod_inv, mod_sqrt
+
+
+class UtilsTestCase(unittest.TestCase):
+    p = 0x7fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffed
+
+    def test_mod_inv(self):
+        for _ in range(10):
+            a = randint(1, self.p - 1)
+            self.assertEqual(a * mod_inv(a, self.p) % self.p, 1)
+        self.assertEqual(mod_inv(-3, 7), 2)
+        with self.assertRaises(Exception):
+            mod_inv(0, self.p)
+        with self.assertRaises(Exception):
+            mod_inv(6, 9)
+
+    def test_batch_mod_inv(self):
+        values = [randint(1, self.p - 1) for _ in range(20)]
+        self.assertEqual(batch_mod_inv(values, self.p), [mod_inv(a, self.p) for a in values])
+        self.assertEqual(batch_mod_inv([5], self.p), [mod_inv(5, self.p)])
+        self.assertEqual(batch_mod_inv([], self.p), [])
+        with self.assertRaises(Exception):
+            batch_mod_inv([3, 0, 5], self.p)
+
+    def test_mod_sqrt(self):
+        # Curve25519 prime (5 mod 8) and a prime which is 1 mod 8 (Tonelli-Shanks).
+        for p in (self.p, 17):
+            for _ in range(10):
+                x = randint(1, p - 1)
+                root = mod_sqrt(x * x % p, p)
+                self.assertIn(root, (x, p - x))
+            self.assertEqual(mod_sqrt(0, p), 0)
+        self.assertEqual(mod_sqrt(2, self.p), 0)
+        self.assertEqual(mod_sqrt(3, 17), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,16 @@ class OperationTestCase(unittest.TestCase):
         cls.gen = account_gen
         cls.op_gen = Operation()
 
+    def new_accounts(self):
+        """
+        :return: two new accounts, the first with 20 coins. The balances of the shared ones are checked by the other
+        tests, so the tests that spend coins use their own.
+        """
+        first = self.gen.get_account()
+        second = self.gen.get_account()
+        first.update_balance(20)
+        return first, second
+
     def test_payment_operation_gen(self):
         self.first.update_balance(20)
         # Ok operation
@@ -40,6 +50,27 @@ class OperationTestCase(unittest.TestCase):
         op = self.op_gen.create_coinbase_op(self.first, 10)
         self.assertIsNotNone(op)
 
+    def test_encoding(self):
+        first, second = self.new_accounts()
+        op, _ = self.op_gen.create_payment_operation(first, second, 5, first.wallet[0])
+        data = op.to_bytes()
+        self.assertEqual(len(data), 1 + 32 + 1 + 2 * 33 + 32 + 8 + 64)
+
+        decoded = Operation.from_bytes(data)
+        self.assertEqual(decoded.to_bytes(), data)
+        self.assertEqual((decoded.sender, decoded.receiver, decoded.amount, decoded.signature),
+                         (op.sender, op.receiver, op.amount, op.signature))
+        self.assertIsNone(decoded.sender.wallet[0].private_key)
+        self.assertEqual([pair.public_key for pair in decoded.sender.wallet],
+                         [pair.public_key for pair in first.wallet])
+        # The public view has no balance, the known accounts are used instead.
+        self.assertFalse(decoded.verify_operation())
+        self.assertTrue(Operation.from_bytes(data, {first.account_id: first}).verify_operation())
+
+        for corrupted in (data[:-1], data + b"\x00", b"\x02" + data[1:], data[:40]):
+            with self.assertRaises(ValueError):
+                Operation.from_bytes(corrupted)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+from copy import deepcopy
+from dataclasses import FrozenInstanceError
 
 from blockchain.account import Account
 from blockchain.transaction.operation import Operation
@@ -15,6 +17,16 @@ class TransactionTestCase(unittest.TestCase):
         cls.op_gen = Operation()
         cls.tx_gen = Transaction()
 
+    def new_accounts(self):
+        """
+        :return: two new accounts, the first with 20 coins. The balances of the shared ones are checked by the other
+        tests, so the tests that spend coins use their own.
+        """
+        first = self.gen.get_account()
+        second = self.gen.get_account()
+        first.update_balance(20)
+        return first, second
+
     def test_payment_transactions(self):
         self.first.update_balance(20)
         self.second.update_balance(13)
@@ -42,6 +54,52 @@ class TransactionTestCase(unittest.TestCase):
         # Ok coinbase transaction
         self.assertIsNotNone(self.tx_gen.crete_coinbase_transaction(self.first, 10))
 
+    def test_created_transactions_are_frozen(self):
+        first, second = self.new_accounts()
+        op1, _ = self.op_gen.create_payment_operation(first, second, 5, first.wallet[0])
+        tx = self.tx_gen.crete_transaction([op1], 255)
+        with self.assertRaises(FrozenInstanceError):
+            tx.sequence = 1
+        with self.assertRaises(FrozenInstanceError):
+            tx.transaction_id = "0" * 40
+
+        copy = deepcopy(tx)
+        self.assertEqual(copy, tx)
+        self.assertEqual(len({tx, copy}), 1)
+        self.assertTrue(copy.verify_transaction())
+
+        # Every call gives a new id, even within the same second.
+        ids = {tx.transaction_id}
+        for _ in range(3):
+            tx.update_time()
+            ids.add(tx.transaction_id)
+        self.assertEqual(len(ids), 4)
+        self.assertTrue(tx.verify_transaction())
+        self.assertEqual(tx.transaction_id, tx.compute_id())
+        with self.assertRaises(FrozenInstanceError):
+            tx.sequence = 1
+
+    def test_encoding(self):
+        first, second = self.new_accounts()
+        op1, _ = self.op_gen.create_payment_operation(first, second, 5, first.wallet[0])
+        op2, _ = self.op_gen.create_payment_operation(first, first, 3, first.wallet[1])
+        tx = self.tx_gen.crete_transaction([op1, op2], 200)
+        data = tx.to_bytes()
+        self.assertLess(len(data), len(repr(tx)))
+
+        decoded = Transaction.from_bytes(data, {first.account_id: first})
+        self.assertEqual(decoded, tx)
+        self.assertEqual(decoded.sequence, 200)
+        self.assertEqual(decoded.to_bytes(), data)
+        self.assertTrue(decoded.verify_transaction())
+        with self.assertRaises(FrozenInstanceError):
+            decoded.sequence = 1
+
+        coinbase = self.tx_gen.crete_coinbase_transaction(first, 10)
+        self.assertEqual(Transaction.from_bytes(coinbase.to_bytes()).sequence, -1)
+        with self.assertRaises(ValueError):
+            Transaction.from_bytes(data[:-3])
+
 
 if __name__ == '__main__':
     unittest.main()